@@ -4,23 +4,35 @@ Supports single query mode and interactive mode
 """
 
 import argparse
+import getpass
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
 import time
 import sys
-from dotenv import load_dotenv
 
-from core.config_loader import ConfigLoader
-from core.model_factory import ModelFactory
-from core.tool_factory import ToolFactory
 from core.agent_service import AgentService
+from core.runtime import get_runtime
+from core.semantic_cache import SemanticCache
+from core.response_cache import ResponseCache
 
 
-def process_single_query(agent_service: AgentService, query: str, agent_type: str, verbose: bool = False):
+def process_single_query(agent_service: AgentService, query: str, agent_type: str, verbose: bool = False,
+                         stream: bool = False):
     """Process a single query and return the result"""
     print(f"🤖 Agent: {agent_type}")
     print(f"🔍 Query: {query}")
     print("⏳ Processing...")
     
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
+    
+    # Streaming prints the answer as it arrives, without execution logs or error metadata
+    if stream and not verbose:
+        return stream_single_query(agent_service, query, agent_type, start_time)
     
     try:
         result = agent_service.process_query(
@@ -31,10 +43,10 @@ def process_single_query(agent_service: AgentService, query: str, agent_type: st
             verbose=verbose
         )
         
-        execution_time = time.time() - start_time
+        execution_time = (time.perf_counter_ns() - start_time) / 1e9
         
         print("\n" + "=" * 60)
-        print("📊 RESULT")
+        print("📊 RESULT (cached)" if result["metadata"].get("cache_hit") else "📊 RESULT")
         print("=" * 60)
         print(result["answer"])
         
@@ -57,6 +69,66 @@ def process_single_query(agent_service: AgentService, query: str, agent_type: st
         return None
 
 
+def stream_single_query(agent_service: AgentService, query: str, agent_type: str, start_time: int):
+    """Print the answer of a single query as it is generated"""
+    print("\n" + "=" * 60)
+    print("📊 RESULT")
+    print("=" * 60)
+    
+    chunks = []
+    try:
+        for chunk in agent_service.stream_query(query, agent_type=agent_type, thread_id="cli_single"):
+            chunks.append(chunk)
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+        return None
+    
+    execution_time = (time.perf_counter_ns() - start_time) / 1e9
+    
+    print("\n\n" + "=" * 60)
+    print(f"⏱️ Execution time: {execution_time:.2f}s")
+    print("🧵 Thread: cli_single")
+    print("=" * 60)
+    
+    return {"answer": "".join(chunks), "metadata": {"thread_id": "cli_single"}}
+
+
+def process_multiple_queries(agent_service: AgentService, queries: list, agent_type: str, verbose: bool = False):
+    """Process several queries concurrently and print results in order"""
+    print(f"🤖 Agent: {agent_type}")
+    print(f"🔍 Queries: {len(queries)}")
+    print("⏳ Processing concurrently...")
+    
+    start_time = time.perf_counter_ns()
+    
+    try:
+        results = agent_service.process_queries(
+            queries,
+            agent_type=agent_type,
+            thread_prefix="cli_batch",
+            verbose=verbose
+        )
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+        return None
+    
+    execution_time = (time.perf_counter_ns() - start_time) / 1e9
+    
+    for query, result in zip(queries, results):
+        print("\n" + "=" * 60)
+        print(f"📊 RESULT: {query}")
+        print("=" * 60)
+        print(result["answer"])
+    
+    print("\n" + "=" * 60)
+    print(f"⏱️ Total execution time: {execution_time:.2f}s")
+    print("=" * 60)
+    
+    return results
+
+
 def run_interactive_mode(agent_service: AgentService, agent_type: str, verbose: bool = False):
     """Run interactive CLI mode"""
     agent_info = agent_service.get_agent_info(agent_type)
@@ -81,7 +153,7 @@ def run_interactive_mode(agent_service: AgentService, agent_type: str, verbose:
                 continue
                 
             print(f"\n🚀 Processing with {agent_name}...")
-            start_time = time.time()
+            start_time = time.perf_counter_ns()
             
             try:
                 result = agent_service.process_query(
@@ -92,10 +164,10 @@ def run_interactive_mode(agent_service: AgentService, agent_type: str, verbose:
                     verbose=verbose
                 )
                 
-                execution_time = time.time() - start_time
+                execution_time = (time.perf_counter_ns() - start_time) / 1e9
                 
                 print("\n" + "=" * 60)
-                print("📊 RESULT")
+                print("📊 RESULT (cached)" if result["metadata"].get("cache_hit") else "📊 RESULT")
                 print("=" * 60)
                 print(result["answer"])
                 
@@ -121,6 +193,120 @@ def run_interactive_mode(agent_service: AgentService, agent_type: str, verbose:
             break
 
 
+def _default_socket_path() -> str:
+    """Per-user socket path, so other local users cannot send queries billed to this one"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"agent-{getpass.getuser()}")
+    return os.path.join(runtime_dir, "agent.sock")
+
+
+DEFAULT_SOCKET_PATH = _default_socket_path()
+
+
+def _ensure_private_dir(directory: str):
+    """Create a directory only the current user can access, refusing one owned by someone else"""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"Socket directory {directory} must be owned by you and not accessible to others")
+
+
+def _remove_stale_socket(socket_path: str):
+    """Remove a socket left behind by a daemon that is no longer running"""
+    if not os.path.lexists(socket_path):
+        return
+    if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket")
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        try:
+            conn.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+
+def _recv_all(conn: socket.socket) -> bytes:
+    """Read from a socket until the peer shuts down its sending side"""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def run_daemon(agent_service: AgentService, socket_path: str, verbose: bool = False):
+    """Serve queries over a Unix socket so startup is paid only once"""
+    
+    class QueryHandler(socketserver.BaseRequestHandler):
+        def handle(self):
+            data = _recv_all(self.request)
+            if not data:
+                # Probe from a daemon checking whether this one is still running
+                return
+            try:
+                request = json.loads(data.decode("utf-8"))
+                result = agent_service.process_query(
+                    query=request["query"],
+                    agent_type=request.get("agent_type", "advanced"),
+                    thread_id=request.get("thread_id"),
+                    verbose=verbose
+                )
+                response = {"answer": result["answer"], "metadata": result["metadata"]}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.request.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+    
+    if socket_path == DEFAULT_SOCKET_PATH:
+        _ensure_private_dir(os.path.dirname(socket_path))
+    _remove_stale_socket(socket_path)
+    
+    with socketserver.ThreadingUnixStreamServer(socket_path, QueryHandler, bind_and_activate=False) as server:
+        # Only the owner may connect; the umask keeps the socket private from the moment it is created
+        old_umask = os.umask(0o177)
+        try:
+            server.server_bind()
+        finally:
+            os.umask(old_umask)
+        os.chmod(socket_path, 0o600)
+        server.server_activate()
+        
+        print(f"🔌 Daemon listening on {socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def send_to_daemon(socket_path: str, query: str, agent_type: str) -> dict:
+    """Send a query to a running daemon and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall(json.dumps({"query": query, "agent_type": agent_type}, ensure_ascii=False).encode("utf-8"))
+        conn.shutdown(socket.SHUT_WR)
+        return json.loads(_recv_all(conn).decode("utf-8"))
+
+
+def run_client(socket_path: str, queries: list, agent_type: str) -> bool:
+    """Answer queries through a running daemon"""
+    success = True
+    for query in queries:
+        try:
+            response = send_to_daemon(socket_path, query, agent_type)
+        except OSError as e:
+            print(f"❌ Cannot reach daemon at {socket_path}: {str(e)}")
+            print("Start it with: python cli_interface.py --daemon")
+            return False
+        
+        if "error" in response:
+            print(f"❌ Error: {response['error']}")
+            success = False
+        else:
+            print(response["answer"])
+    return success
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -132,10 +318,20 @@ Examples:
   python cli_interface.py -q "What is 2+2?" -a standard
   python cli_interface.py -q "What's the weather like?" -a advanced -v
   
+  # Print the answer while it is generated
+  python cli_interface.py -q "What is LangGraph?" --stream
+  
+  # Several queries processed concurrently
+  python cli_interface.py -q "Capital of France?" -q "Height of Everest?" -a advanced
+  
   # Interactive mode  
   python cli_interface.py -a standard
   python cli_interface.py -a advanced -v
   
+  # Keep a daemon running and send it queries without startup overhead
+  python cli_interface.py --daemon
+  python cli_interface.py --client -q "What is 2+2?" -a standard
+  
   # With custom server settings
   python cli_interface.py -q "Hello" -a standard -p 8080 -e http://localhost
   
@@ -150,7 +346,8 @@ Available tools: DuckDuckGo, Wikipedia, Math, DateTime
     parser.add_argument(
         "-q", "--query", 
         type=str,
-        help="Single query to process (if not provided, runs in interactive mode)"
+        action="append",
+        help="Query to process; repeat to run several queries concurrently (if not provided, runs in interactive mode)"
     )
     
     parser.add_argument(
@@ -166,6 +363,50 @@ Available tools: DuckDuckGo, Wikipedia, Math, DateTime
         help="Enable verbose output with execution logs"
     )
     
+    parser.add_argument(
+        "--stream", 
+        action="store_true",
+        help="Print the answer of a single query as it is generated (ignored with --verbose)"
+    )
+    
+    parser.add_argument(
+        "--cache", 
+        action="store_true",
+        help="Reuse answers for repeated queries across runs (stored in logs/response_cache.sqlite)"
+    )
+    
+    parser.add_argument(
+        "--semantic-cache", 
+        action="store_true",
+        help="Also reuse answers for semantically similar queries (requires sentence-transformers, implies --cache)"
+    )
+    
+    parser.add_argument(
+        "--cache-ttl", 
+        type=float, 
+        default=None,
+        help="Serve cached answers only for this many seconds after they were stored (default: no expiry)"
+    )
+    
+    parser.add_argument(
+        "--daemon", 
+        action="store_true",
+        help="Initialize once and serve queries over a Unix socket"
+    )
+    
+    parser.add_argument(
+        "--client", 
+        action="store_true",
+        help="Send queries given with -q to a running daemon"
+    )
+    
+    parser.add_argument(
+        "--socket", 
+        type=str, 
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Unix socket path used by --daemon/--client (default: {DEFAULT_SOCKET_PATH})"
+    )
+    
     parser.add_argument(
         "-p", "--port", 
         type=int, 
@@ -182,22 +423,26 @@ Available tools: DuckDuckGo, Wikipedia, Math, DateTime
     
     args = parser.parse_args()
     
-    # Load environment and initialize service
-    load_dotenv()
+    # Client mode needs no configuration, LLM or tools
+    if args.client:
+        if not args.query:
+            parser.error("--client requires at least one -q/--query")
+        sys.exit(0 if run_client(args.socket, args.query, args.agent) else 1)
     
     try:
-        # Load configuration
-        config_loader = ConfigLoader()
-        config = config_loader.load_config()
-        
-        # Create LLM and tools
-        llm = ModelFactory.create_llm(config["llm"])
-        tool_factory = ToolFactory()
-        tools = tool_factory.create_tools(config["tools"], llm)
+        # Load configuration, LLM, tools and agent service (shared process-wide)
+        runtime = get_runtime()
+        tools = runtime.tools
+        recursion_limit = runtime.recursion_limit
+        agent_service = runtime.agent_service
         
-        # Create agent service
-        recursion_limit = config.get("graph", {}).get("recursion_limit", 50)
-        agent_service = AgentService(llm, tools, recursion_limit)
+        # Optional response cache - load the embedding model up front so a missing dependency fails fast
+        if args.cache or args.semantic_cache:
+            semantic_cache = None
+            if args.semantic_cache:
+                semantic_cache = SemanticCache()
+                semantic_cache.encoder
+            agent_service.response_cache = ResponseCache(semantic_cache=semantic_cache, ttl=args.cache_ttl)
         
         # Validate agent type
         available_agents = agent_service.get_available_agent_types()
@@ -214,13 +459,21 @@ Available tools: DuckDuckGo, Wikipedia, Math, DateTime
         print(f"🔄 Recursion limit: {recursion_limit}")
         print("=" * 60)
         
-        # Run in single query or interactive mode
-        if args.query:
+        # Run in daemon, single query or interactive mode
+        if args.daemon:
+            runtime.warmup()
+            run_daemon(agent_service, args.socket, args.verbose)
+        elif args.query and len(args.query) > 1:
+            # Concurrent multi-query mode
+            results = process_multiple_queries(agent_service, args.query, args.agent, args.verbose)
+            sys.exit(0 if results else 1)
+        elif args.query:
             # Single query mode
-            result = process_single_query(agent_service, args.query, args.agent, args.verbose)
+            result = process_single_query(agent_service, args.query[0], args.agent, args.verbose, args.stream)
             sys.exit(0 if result else 1)
         else:
-            # Interactive mode
+            # Interactive mode - open the LLM connection while the user types the first query
+            threading.Thread(target=runtime.warmup, daemon=True).start()
             run_interactive_mode(agent_service, args.agent, args.verbose)
             
     except KeyboardInterrupt:
@@ -2,38 +2,407 @@
 Advanced Agent with a controlled workflow using LangGraph
 """
 
-import operator
-from typing import Annotated, Dict, Any, List, TypedDict, Literal
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import (TYPE_CHECKING, Annotated, AsyncIterator, Awaitable, Callable, Dict, Any, Iterator, List,
+                    Optional, Set, Tuple, TypedDict, Literal)
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.language_models import BaseLanguageModel
+from langchain_core.runnables import RunnableConfig, ensure_config
 from langchain_core.tools import BaseTool
-from langgraph.graph import StateGraph, END, START
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.errors import GraphRecursionError
+from pydantic import TypeAdapter, ValidationError
+
+from .agent_interface import AgentInterface, IncompleteAnswer
+from .async_utils import iterate_sync, run_sync
+
+# LangGraph is imported when a workflow is first built or run, not when the module is loaded
+if TYPE_CHECKING:
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.errors import GraphRecursionError
+    from langgraph.graph.state import CompiledStateGraph
+
+# Results of the deterministic routing steps (classification, decision) keyed by
+# sha256(model + node + request). Agents are created per query, so this lives at module level.
+_NODE_CACHE: Dict[str, str] = {}
+_NODE_CACHE_SIZE = 1024
+_node_cache_lock = threading.Lock()
+
+# Search calls are network-bound; the queries of one research plan run side by side.
+# Shared by all agents, since an agent is created per query.
+MAX_PARALLEL_SEARCHES = 5
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=MAX_PARALLEL_SEARCHES, thread_name_prefix="search")
+SEARCH_TIMEOUT = 30
+
+_QUERY_LIST = TypeAdapter(List[str])
+
+# Size limits for search results included in synthesis prompts
+MAX_SEARCH_RESULT_CHARS = 1000
+MAX_SEARCH_CONTEXT_CHARS = 4000
+MAX_SYNTHESIS_SNIPPETS = 20
+
+_WORD = re.compile(r"\w+")
+
+
+def _parse_search_queries(plan: str, fallback: str) -> List[str]:
+    """Extract the JSON list of search queries from a research plan"""
+    match = re.search(r"\[.*\]", plan, re.DOTALL)
+    if match:
+        try:
+            queries = [query.strip() for query in _QUERY_LIST.validate_json(match.group(0)) if query.strip()]
+        except ValidationError:
+            queries = []
+        if queries:
+            # Drop duplicates, keep order
+            return list(dict.fromkeys(queries))[:MAX_PARALLEL_SEARCHES]
+    return [fallback]
+
+
+# Tool used for planned queries, and other lookup tools a query can be routed to with a "Name:" prefix
+SEARCH_TOOL = "DuckDuckGo"
+_TOOL_PREFIX = re.compile(r"^\s*(wikipedia|duckduckgo)\s*:\s*(.+)$", re.IGNORECASE | re.DOTALL)
+
+
+def _route_search_query(query: str) -> Tuple[str, str]:
+    """Split a planned query into the name of the tool to run it with and the query itself"""
+    match = _TOOL_PREFIX.match(query)
+    if match:
+        return {"wikipedia": "Wikipedia", "duckduckgo": SEARCH_TOOL}[match.group(1).lower()], match.group(2).strip()
+    return SEARCH_TOOL, query
+
+
+# Queries that are clearly answerable without searching, or clearly need fresh information.
+# A query matching exactly one group skips the classification LLM call.
+_DIRECT_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"^\s*(define|translate|convert)\b",
+    # The whole query is an arithmetic expression, optionally asked for ("what is 17 * 23?");
+    # numbers inside other text are usually dates, versions or ranges ("Windows 10/11")
+    r"^\s*((what is|what's|calculate|compute|evaluate|how much is)\s+)?(?!\d{4}-\d\d?(-\d\d?)?\s*\??\s*$)"
+    r"\(?\d+(\.\d+)?(\s*[-+*/^]\s*\(?\d+(\.\d+)?\)?)+\s*[=?]?\s*$",
+    r"^\s*how (do|to) (you |i )?(spell|pronounce)\b",
+)]
+_RESEARCH_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"\b(latest|current|currently|today|tonight|yesterday|recent|recently|news|this (week|month|year))\b",
+    r"\b(stock price|exchange rate|weather|forecast)\b",
+    r"\b20\d\d\b",
+)]
+
+
+def _classify_by_pattern(query: str) -> Optional[str]:
+    """Classify an obvious query without the LLM; None when the patterns are inconclusive"""
+    direct = any(pattern.search(query) for pattern in _DIRECT_PATTERNS)
+    research = any(pattern.search(query) for pattern in _RESEARCH_PATTERNS)
+    if direct == research:
+        return None
+    return "direct" if direct else "research"
+
+
+class SearchResults(TypedDict):
+    """Distinct search result snippets gathered so far, stored as parallel lists"""
+    sources: List[str]
+    snippets: List[str]
+    iterations: List[int]
+    hashes: Set[str]
+
+
+def _empty_search_results() -> SearchResults:
+    return {"sources": [], "snippets": [], "iterations": [], "hashes": set()}
+
+
+def _fingerprint(text: str) -> str:
+    """Fingerprint a snippet so results differing only in case or whitespace count as duplicates"""
+    return hashlib.sha256(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+def _add_search_results(results: SearchResults, outputs: List[Tuple[str, str]], iteration: int) -> SearchResults:
+    """
+    Return a copy of the results extended with the new, not yet seen snippets.
+    
+    Args:
+        results: Search results gathered so far
+        outputs: (search query, tool output) pairs; outputs are split into snippets on blank lines
+        iteration: Search iteration the outputs come from
+        
+    Returns:
+        Updated search results
+    """
+    updated: SearchResults = {
+        "sources": list(results["sources"]),
+        "snippets": list(results["snippets"]),
+        "iterations": list(results["iterations"]),
+        "hashes": set(results["hashes"])
+    }
+    for source, output in outputs:
+        for snippet in re.split(r"\n\s*\n", str(output)):
+            snippet = snippet.strip()
+            fingerprint = _fingerprint(snippet)
+            if not snippet or fingerprint in updated["hashes"]:
+                continue
+            updated["hashes"].add(fingerprint)
+            updated["sources"].append(source)
+            updated["snippets"].append(snippet)
+            updated["iterations"].append(iteration)
+    return updated
+
+
+def _rank_snippets(query: str, snippets: List[str], top_k: int) -> List[int]:
+    """
+    Rank snippets by TF-IDF relevance to the query.
+    
+    Args:
+        query: Text the snippets are scored against
+        snippets: Snippets to rank
+        top_k: Maximum number of snippets to return
+        
+    Returns:
+        Indices of the most relevant snippets, best first (ties keep the original order)
+    """
+    terms = set(_WORD.findall(query.lower()))
+    counts = [Counter(_WORD.findall(snippet.lower())) for snippet in snippets]
+    document_frequency = Counter(term for count in counts for term in terms if term in count)
+    idf = {term: math.log((1 + len(snippets)) / (1 + document_frequency[term])) + 1 for term in terms}
+    
+    def score(index: int) -> float:
+        count = counts[index]
+        length = sum(count.values()) or 1
+        return sum(count[term] * idf[term] for term in terms) / math.sqrt(length)
+    
+    return sorted(range(len(snippets)), key=lambda index: -score(index))[:top_k]
+
+
+def _format_snippets(results: SearchResults, indices: List[int]) -> List[str]:
+    """Label the selected snippets with the search query that found them"""
+    return [f"[{results['sources'][index]}] {results['snippets'][index]}" for index in indices]
+
+
+def _append_messages(messages: List[BaseMessage], new_messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Reducer for the message history that appends in place.
+    
+    operator.add would copy the whole history on every node write. Each run starts
+    from a fresh list, so extending the channel's own list is safe.
+    """
+    messages.extend(new_messages)
+    return messages
 
-from .agent_interface import AgentInterface
 
 class AgentState(TypedDict):
     """State of the research agent"""
-    messages: Annotated[List[HumanMessage | AIMessage | SystemMessage], operator.add]
+    messages: Annotated[List[HumanMessage | AIMessage | SystemMessage], _append_messages]
     query: str
     research_plan: str
-    search_results: List[str]
+    search_queries: List[str]
+    search_results: SearchResults
     reflection: str
     next_action: str
     iteration_count: int
     final_answer: str
 
+# Static instructions for each LLM step. They are sent as the system message so every
+# request starts with an identical prefix that providers can serve from prompt cache;
+# all query-specific content goes into the human message after it.
+CLASSIFY_SYS = """Analyze the user's query and determine if it requires internet research or can be answered directly.
+
+Respond with exactly one word, without explanation:
+- "RESEARCH" if it requires current information, facts, or external data
+- "DIRECT" if it can be answered with general knowledge"""
+
+PLAN_SYS = """Plan the web research for the user's query.
+
+Write 3 to 5 independent search queries that together cover the information needed:
+start with a broad query, then add specific ones for individual facts.
+
+For a well-known topic that an encyclopedia covers, prefix the query with "Wikipedia:"
+to look it up there instead of on the web.
+
+Respond only with a JSON list of strings, for example:
+["broad search query", "specific search query", "Wikipedia: encyclopedia topic"]"""
+
+REFLECT_SYS = """You review search results gathered while researching a query.
+
+Reflect on:
+1. How well do current results answer the original query?
+2. What information is still missing?
+3. What should be the next search strategy?
+4. Should we continue searching or synthesize an answer?"""
+
+DECIDE_SYS = """Based on the reflection on the research so far, decide whether to:
+- CONTINUE searching (if more information needed, max 3 iterations)
+- FINISH and synthesize answer (if sufficient information gathered)
+
+Respond with exactly one word, without explanation: CONTINUE or FINISH"""
+
+SYNTH_SYS = """Provide a comprehensive, well-structured answer to the original query based on all the research gathered.
+Include:
+1. Direct answer to the question
+2. Supporting evidence from research
+3. Any important caveats or limitations
+
+IMPORTANT: Answer in the same language as the original query."""
+
+# Classification and decision replies should be a single word; the cap leaves room for
+# models that wrap it in a sentence, while stopping a runaway explanation
+ROUTING_MAX_TOKENS = 64
+
+
+def _routing_label(response: BaseMessage, labels: Tuple[str, ...]) -> Optional[str]:
+    """Return the first of the labels found in a routing reply; None (logged) when none is"""
+    text = response.content.upper() if isinstance(response.content, str) else str(response.content).upper()
+    for label in labels:
+        if label in text:
+            return label
+    
+    metadata = getattr(response, "response_metadata", None) or {}
+    truncated = metadata.get("finish_reason") == "length" or metadata.get("stop_reason") == "max_tokens"
+    logging.warning("Routing reply %r contains none of %s%s, falling back to the default",
+                    response.content[:80], "/".join(labels), " (truncated at the token cap)" if truncated else "")
+    return None
+
+# Dynamic parts of the prompts, filled in per request
+REFLECT_HUMAN = """Original query: {query}
+Research plan: {research_plan}
+Current iteration: {iteration_count}
+
+Latest search results:
+{latest_results}"""
+
+DECIDE_HUMAN = """Current iteration: {iteration_count}
+
+Reflection:
+{reflection}"""
+
+SYNTH_HUMAN = """Original query: {query}
+
+Research conducted:
+{research_plan}
+
+Search results:
+{search_results}
+
+Reflection:
+{reflection}"""
+
+
+# Separator around verbose step output
+_RULE = "─" * 50
+
+# Search iterations after which the workflow always moves on to synthesis
+MAX_SEARCH_ITERATIONS = 3
+
+# Reflection phrases that settle the continue/finish decision without asking the LLM
+CONTINUE_SIGNALS = ("missing", "incomplete", "need more", "unclear")
+FINISH_SIGNALS = ("sufficient", "comprehensive", "enough information")
+
+
+def _uses_cache_control(llm: BaseLanguageModel) -> bool:
+    """Anthropic caches prompt prefixes only when explicitly asked to"""
+    return type(llm).__module__.startswith("langchain_anthropic")
+
+
+@lru_cache(maxsize=None)
+def _prompt_template(system_prompt: str, human_template: str, cache_control: bool = False) -> ChatPromptTemplate:
+    """
+    Build (once) a prompt from a static system message and a human message template.
+    
+    The system message is kept as a finished message, so it is never re-formatted
+    and can carry Anthropic's cache_control marker.
+    """
+    if cache_control:
+        system_message = SystemMessage(
+            content=[{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        )
+    else:
+        system_message = SystemMessage(content=system_prompt)
+    return ChatPromptTemplate.from_messages([system_message, ("human", human_template)])
+
+
+class _RunContext:
+    """
+    Mutable state of a single workflow run.
+    
+    An agent may serve several queries at once, so anything that belongs to one
+    query lives here and reaches the graph nodes through the run config.
+    """
+    
+    def __init__(self):
+        # Tool results of this run, keyed by (tool name, arguments)
+        self.call_cache: Dict[Tuple[str, str], Any] = {}
+        # Latest workflow state, used for a draft answer when the recursion limit is hit
+        self.last_state: Optional[Dict[str, Any]] = None
+    
+    @staticmethod
+    def current() -> "_RunContext":
+        """Return the context of the run being executed, or a fresh one outside a run"""
+        return ensure_config().get("configurable", {}).get("run") or _RunContext()
+
+
 class AdvancedResearchAgent(AgentInterface):
     """Advanced agent with controlled workflow for research tasks"""
     
-    def __init__(self, llm: BaseLanguageModel, tools: List[BaseTool], verbose: bool = True, recursion_limit: int = 50):
+    # Immutable starting values of the workflow state fields
+    _INITIAL_STATE: Dict[str, Any] = {
+        "research_plan": "",
+        "reflection": "",
+        "next_action": "",
+        "iteration_count": 0,
+        "final_answer": ""
+    }
+    
+    # Compiled on first use and shared by all agents without checkpoints
+    _COMPILED_GRAPH: Optional["CompiledStateGraph"] = None
+    _graph_lock = threading.Lock()
+    
+    def __init__(self, llm: BaseLanguageModel, tools: List[BaseTool], verbose: bool = True, recursion_limit: int = 50,
+                 enable_checkpoints: bool = False, routing_llm: Optional[BaseLanguageModel] = None):
         self.llm = llm
+        # Classification and the continue/finish decision are short, near-binary answers,
+        # so they can run on a smaller, faster model than planning and synthesis
+        self.routing_llm = routing_llm or llm
+        self._classify_tmpl = _prompt_template(CLASSIFY_SYS, "{query}", _uses_cache_control(self.routing_llm))
+        self._plan_tmpl = _prompt_template(PLAN_SYS, "{query}", _uses_cache_control(llm))
+        self._reflect_tmpl = _prompt_template(REFLECT_SYS, REFLECT_HUMAN, _uses_cache_control(llm))
+        self._decide_tmpl = _prompt_template(DECIDE_SYS, DECIDE_HUMAN, _uses_cache_control(self.routing_llm))
+        self._synth_tmpl = _prompt_template(SYNTH_SYS, SYNTH_HUMAN, _uses_cache_control(llm))
         self.tools = {tool.name: tool for tool in tools}
-        self.checkpointer = MemorySaver()
+        # Each query runs once from a fresh state, so checkpointing every step is not needed by default
+        self.checkpointer = None
+        if enable_checkpoints:
+            from langgraph.checkpoint.memory import MemorySaver
+            self.checkpointer = MemorySaver()
         self.verbose = verbose
         self.recursion_limit = recursion_limit
-        self.graph = self._build_graph()
+        self._graph: Optional["CompiledStateGraph"] = None
+    
+    @property
+    def graph(self) -> "CompiledStateGraph":
+        """Return the workflow graph, building it on first use"""
+        if self._graph is None:
+            # The workflow is the same for every agent; only a checkpointer needs a graph of its own
+            self._graph = self._shared_graph() if self.checkpointer is None else self._build_graph(self.checkpointer)
+        return self._graph
+    
+    @graph.setter
+    def graph(self, graph: "CompiledStateGraph"):
+        self._graph = graph
+    
+    @classmethod
+    def _shared_graph(cls) -> "CompiledStateGraph":
+        """Return the graph shared by agents without checkpoints, compiling it once"""
+        if cls._COMPILED_GRAPH is None:
+            with cls._graph_lock:
+                if cls._COMPILED_GRAPH is None:
+                    cls._COMPILED_GRAPH = cls._build_graph()
+        return cls._COMPILED_GRAPH
     
     @property
     def name(self) -> str:
@@ -47,51 +416,141 @@ class AdvancedResearchAgent(AgentInterface):
     
     def _verbose_print(self, step: str, content: str, truncate_at: int = 300):
         """Print verbose output if enabled"""
-        if self.verbose:
-            print(f"\n🔄 {step}")
-            print("─" * 50)
-            if len(content) > truncate_at:
-                print(f"{content[:truncate_at]}...")
-                print(f"[Truncated at {truncate_at} characters]")
-            else:
-                print(content)
-            print("─" * 50)
+        if not self.verbose:
+            return
+        if len(content) > truncate_at:
+            content = f"{content[:truncate_at]}...\n[Truncated at {truncate_at} characters]"
+        # One write per block keeps the output of concurrent steps from interleaving line by line
+        print(f"\n🔄 {step}\n{_RULE}\n{content}\n{_RULE}")
+    
+    def _node_cache_key(self, node: str, content: str) -> str:
+        """Build the routing cache key for a node request on this agent's routing model"""
+        llm = self.routing_llm
+        model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+        return hashlib.sha256(f"{model}\x00{node}\x00{content}".encode()).hexdigest()
+    
+    def _cache_node_result(self, key: str, result: str):
+        """Store a routing result, evicting the oldest entry when the cache is full"""
+        with _node_cache_lock:
+            if key not in _NODE_CACHE and len(_NODE_CACHE) >= _NODE_CACHE_SIZE:
+                del _NODE_CACHE[next(iter(_NODE_CACHE))]
+            _NODE_CACHE[key] = result
     
-    def _build_graph(self) -> StateGraph:
+    @staticmethod
+    def _compact_search_results(results: List[str], max_chars: int = MAX_SEARCH_CONTEXT_CHARS,
+                                max_result_chars: int = MAX_SEARCH_RESULT_CHARS) -> str:
+        """
+        Prepare search results for a prompt: drop duplicates, trim each result and cap the total size.
+        
+        Args:
+            results: Search results gathered so far
+            max_chars: Maximum total length of the returned text
+            max_result_chars: Maximum length of a single result
+            
+        Returns:
+            Newline-separated search results
+        """
+        seen = set()
+        output = StringIO()
+        for result in results:
+            fingerprint = _fingerprint(result)
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            
+            remaining = max_chars - output.tell() - (1 if output.tell() else 0)
+            if remaining <= 0:
+                break
+            if output.tell():
+                output.write("\n")
+            output.write(result[:min(max_result_chars, remaining)])
+        return output.getvalue()
+    
+    @staticmethod
+    def _latest_search_results(state: AgentState) -> str:
+        """Format the snippets found by the most recent search iteration"""
+        results = state.get("search_results") or _empty_search_results()
+        latest = [index for index, iteration in enumerate(results["iterations"])
+                  if iteration == state["iteration_count"]]
+        return "\n\n".join(_format_snippets(results, latest)) or "No results"
+    
+    @staticmethod
+    def _relevant_snippets(state: AgentState, top_k: int = MAX_SYNTHESIS_SNIPPETS) -> List[str]:
+        """Select the snippets most relevant to the query, best first"""
+        results = state.get("search_results") or _empty_search_results()
+        return _format_snippets(results, _rank_snippets(state.get("query", ""), results["snippets"], top_k))
+    
+    def _call_tool(self, call_cache: Dict[Tuple[str, str], Any], tool: BaseTool, **kwargs) -> Any:
+        """Call a tool, reusing the result of an identical call made earlier in the same run"""
+        key = (tool.name, json.dumps(kwargs, sort_keys=True, default=str))
+        if key not in call_cache:
+            call_cache[key] = tool.func(**kwargs)
+        else:
+            self._verbose_print("Search Cache", f"Reusing result of identical {tool.name} call")
+        return call_cache[key]
+    
+    @staticmethod
+    def _node(step: Callable[["AdvancedResearchAgent", AgentState], Awaitable[Dict[str, Any]]]):
+        """
+        Wrap a workflow step as a graph node.
+        
+        The compiled graph is shared by all agents, so the agent running the query is
+        taken from the run config. The state after the step is mirrored on the run
+        context, so a draft answer can be written without reading checkpoints back.
+        """
+        async def node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+            agent: AdvancedResearchAgent = config["configurable"]["agent"]
+            update = await step(agent, state)
+            run: Optional[_RunContext] = config["configurable"].get("run")
+            if run is not None:
+                run.last_state = {**state, **update}
+            return update
+        
+        return node
+    
+    @classmethod
+    def _build_graph(cls, checkpointer: Optional["MemorySaver"] = None) -> "CompiledStateGraph":
         """Build the controlled workflow graph"""
+        from langgraph.graph import StateGraph, END, START
         
         # Define the workflow graph
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("classify_query", self._classify_query)
-        workflow.add_node("create_research_plan", self._create_research_plan)
-        workflow.add_node("execute_search", self._execute_search)
-        workflow.add_node("reflect_on_results", self._reflect_on_results)
-        workflow.add_node("decide_next_step", self._decide_next_step)
-        workflow.add_node("synthesize_answer", self._synthesize_answer)
+        workflow.add_node("classify_and_plan", cls._node(cls._classify_and_plan))
+        workflow.add_node("execute_search", cls._node(cls._execute_search))
+        workflow.add_node("reflect_on_results", cls._node(cls._reflect_on_results))
+        workflow.add_node("decide_next_step", cls._node(cls._decide_next_step))
+        workflow.add_node("synthesize_answer", cls._node(cls._synthesize_answer))
         
         # Define the flow
-        workflow.add_edge(START, "classify_query")
+        workflow.add_edge(START, "classify_and_plan")
         
         # Conditional edges based on query type
         workflow.add_conditional_edges(
-            "classify_query",
-            self._should_research,
+            "classify_and_plan",
+            cls._should_research,
             {
-                "research": "create_research_plan",
+                "research": "execute_search",
                 "direct": "synthesize_answer"
             }
         )
         
-        workflow.add_edge("create_research_plan", "execute_search")
-        workflow.add_edge("execute_search", "reflect_on_results")
+        # The last permitted iteration always finishes, so its reflection would go unused
+        workflow.add_conditional_edges(
+            "execute_search",
+            cls._should_reflect,
+            {
+                "reflect": "reflect_on_results",
+                "finish": "synthesize_answer"
+            }
+        )
         workflow.add_edge("reflect_on_results", "decide_next_step")
         
         # Conditional continuation
         workflow.add_conditional_edges(
             "decide_next_step",
-            self._should_continue,
+            cls._should_continue,
             {
                 "continue": "execute_search",
                 "finish": "synthesize_answer"
@@ -100,154 +559,186 @@ class AdvancedResearchAgent(AgentInterface):
         
         workflow.add_edge("synthesize_answer", END)
         
-        return workflow.compile(checkpointer=self.checkpointer)
+        return workflow.compile(checkpointer=checkpointer)
     
-    def _classify_query(self, state: AgentState) -> Dict[str, Any]:
-        """Classify if query requires research or can be answered directly"""
-        
-        self._verbose_print("STEP 1: Query Classification", f"Analyzing query: {state['query']}")
-        
-        classification_prompt = f"""
-        Analyze this query and determine if it requires internet research or can be answered directly:
-        
-        Query: {state['query']}
+    async def _classify_and_plan(self, state: AgentState) -> Dict[str, Any]:
+        """Classify the query and draft a research plan with two concurrent LLM calls"""
+        
+        self._verbose_print("STEP 1: Query Classification & Research Planning", f"Analyzing query: {state['query']}")
+        
+        cache_key = self._node_cache_key("classify", state['query'])
+        classification = _NODE_CACHE.get(cache_key) or _classify_by_pattern(state['query'])
+        plan_response = None
+        
+        if classification is None:
+            # Both prompts depend only on the query, so they are sent concurrently
+            classify_messages = self._classify_tmpl.format_messages(query=state['query'])
+            plan_messages = self._plan_tmpl.format_messages(query=state['query'])
+            classification_response, plan_response = await asyncio.gather(
+                self.routing_llm.ainvoke(classify_messages, max_tokens=ROUTING_MAX_TOKENS),
+                self.llm.ainvoke(plan_messages)
+            )
+            label = _routing_label(classification_response, ("RESEARCH", "DIRECT"))
+            classification = (label or "DIRECT").lower()
+            if label:
+                self._cache_node_result(cache_key, classification)
+        elif classification == "research":
+            # Classification is already known - only the plan is requested
+            plan_response = await self.llm.ainvoke(self._plan_tmpl.format_messages(query=state['query']))
         
-        Respond with either:
-        - "RESEARCH" if it requires current information, facts, or external data
-        - "DIRECT" if it can be answered with general knowledge
-        
-        Classification:"""
+        self._verbose_print("Classification Result", f"Query classified as: {classification.upper()}")
         
-        response = self.llm.invoke([HumanMessage(content=classification_prompt)])
-        classification = "research" if "RESEARCH" in response.content.upper() else "direct"
+        if classification == "direct":
+            # The plan is not needed for a direct answer
+            return {
+                "next_action": classification
+            }
         
-        self._verbose_print("Classification Result", f"Query classified as: {classification.upper()}")
+        self._verbose_print("Research Plan Created", plan_response.content)
         
         return {
-            "messages": [AIMessage(content=f"Query classified as: {classification}")],
-            "next_action": classification
+            "next_action": classification,
+            "research_plan": plan_response.content,
+            "search_queries": _parse_search_queries(plan_response.content, state['query']),
+            "iteration_count": 0
         }
     
-    def _should_research(self, state: AgentState) -> Literal["research", "direct"]:
+    @staticmethod
+    def _should_research(state: AgentState) -> Literal["research", "direct"]:
         """Determine if research is needed"""
         return state.get("next_action", "direct")
     
-    def _create_research_plan(self, state: AgentState) -> Dict[str, Any]:
-        """Create a structured research plan"""
-        
-        self._verbose_print("STEP 2: Research Planning", "Creating strategic research plan...")
-        
-        planning_prompt = f"""
-        Create a detailed research plan for this query: {state['query']}
-        
-        Your plan should include:
-        1. Key search terms and phrases
-        2. Types of information to look for
-        3. Search strategy (broad first, then specific)
-        4. Quality criteria for sources
-        
-        Research Plan:"""
-        
-        response = self.llm.invoke([HumanMessage(content=planning_prompt)])
-        
-        self._verbose_print("Research Plan Created", response.content)
-        
-        return {
-            "messages": [AIMessage(content="Research plan created")],
-            "research_plan": response.content,
-            "iteration_count": 0
-        }
-    
-    def _execute_search(self, state: AgentState) -> Dict[str, Any]:
+    async def _execute_search(self, state: AgentState) -> Dict[str, Any]:
         """Execute search based on current plan and iteration"""
         
-        search_tool = self.tools.get("DuckDuckGo")
+        search_tool = self.tools.get(SEARCH_TOOL)
         if not search_tool:
             self._verbose_print("Search Error", "No search tool available")
-            return {"messages": [AIMessage(content="No search tool available")]}
+            return {}
         
-        # Determine search query based on iteration
+        # Determine search queries based on iteration
         if state["iteration_count"] == 0:
-            # First search - broad
-            search_query = state["query"]
+            # First search - the planned queries, broad first
+            search_queries = state.get("search_queries") or [state["query"]]
             self._verbose_print(f"STEP 3: Initial Search (Iteration {state['iteration_count'] + 1})", 
-                              f"Executing broad search: {search_query}")
+                              f"Executing {len(search_queries)} planned searches: {search_queries}")
         else:
             # Subsequent searches - refined based on reflection
-            search_query = f"{state['query']} {state.get('reflection', '')}"
+            search_queries = [f"{state['query']} {state.get('reflection', '')}"]
             self._verbose_print(f"STEP 3: Refined Search (Iteration {state['iteration_count'] + 1})", 
-                              f"Executing refined search: {search_query}")
+                              f"Executing refined search: {search_queries[0]}")
+        
+        # Queries routed to another lookup tool run alongside the web searches; unknown tools fall back to search
+        calls = []
+        for query in search_queries:
+            tool_name, tool_query = _route_search_query(query)
+            calls.append((self.tools.get(tool_name, search_tool), tool_query))
+        
+        call_cache = _RunContext.current().call_cache
+        
+        # Tool functions are blocking; run them on the search pool without blocking the event loop.
+        # run_in_executor does not carry context variables over, so each call runs in a copy of
+        # the current context to keep its output in the caller's log capture
+        loop = asyncio.get_running_loop()
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    loop.run_in_executor(_SEARCH_POOL, contextvars.copy_context().run,
+                                         partial(self._call_tool, call_cache, tool, query=tool_query)),
+                    SEARCH_TIMEOUT
+                )
+                for tool, tool_query in calls
+            ),
+            return_exceptions=True
+        )
         
-        try:
-            search_results = search_tool.func(query=search_query)
-            
-            self._verbose_print("Search Results", search_results)
-            
-            return {
-                "messages": [AIMessage(content=f"Executed search: {search_query}")],
-                "search_results": state.get("search_results", []) + [search_results],
-                "iteration_count": state["iteration_count"] + 1
-            }
-        except Exception as e:
-            self._verbose_print("Search Error", f"Search failed: {str(e)}")
+        outputs, errors = [], []
+        for query, outcome in zip(search_queries, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append(f"{query}: {str(outcome) or type(outcome).__name__}")
+            else:
+                outputs.append((query, outcome))
+        
+        previous_results = state.get("search_results") or _empty_search_results()
+        if not outputs:
+            self._verbose_print("Search Error", f"Search failed: {'; '.join(errors)}")
             return {
-                "messages": [AIMessage(content=f"Search failed: {str(e)}")],
-                "search_results": state.get("search_results", [])
+                "search_results": previous_results
             }
+        
+        iteration = state["iteration_count"] + 1
+        search_results = _add_search_results(previous_results, outputs, iteration)
+        new_results = list(range(len(previous_results["snippets"]), len(search_results["snippets"])))
+        if self.verbose:
+            self._verbose_print("Search Results", "\n\n".join(_format_snippets(search_results, new_results))
+                                or "No new results")
+        
+        return {
+            "search_results": search_results,
+            "iteration_count": iteration
+        }
+    
+    @staticmethod
+    def _should_reflect(state: AgentState) -> Literal["reflect", "finish"]:
+        """Skip reflection once no further search iteration is allowed"""
+        return "finish" if state["iteration_count"] >= MAX_SEARCH_ITERATIONS else "reflect"
     
-    def _reflect_on_results(self, state: AgentState) -> Dict[str, Any]:
+    async def _reflect_on_results(self, state: AgentState) -> Dict[str, Any]:
         """Reflect on search results and plan next steps"""
         
         self._verbose_print(f"STEP 4: Reflection (After Iteration {state['iteration_count']})", 
                           "Analyzing search results and planning next steps...")
         
-        reflection_prompt = f"""
-        Original query: {state['query']}
-        Research plan: {state['research_plan']}
-        Current iteration: {state['iteration_count']}
-        
-        Latest search results:
-        {state['search_results'][-1] if state['search_results'] else 'No results'}
-        
-        Reflect on:
-        1. How well do current results answer the original query?
-        2. What information is still missing?
-        3. What should be the next search strategy?
-        4. Should we continue searching or synthesize an answer?
-        
-        Reflection:"""
+        messages = self._reflect_tmpl.format_messages(
+            query=state['query'],
+            research_plan=state['research_plan'],
+            iteration_count=state['iteration_count'],
+            latest_results=self._latest_search_results(state)
+        )
         
-        response = self.llm.invoke([HumanMessage(content=reflection_prompt)])
+        response = await self.llm.ainvoke(messages)
         
         self._verbose_print("Reflection Complete", response.content)
         
         return {
-            "messages": [AIMessage(content="Reflected on search results")],
             "reflection": response.content
         }
     
-    def _decide_next_step(self, state: AgentState) -> Dict[str, Any]:
+    async def _decide_next_step(self, state: AgentState) -> Dict[str, Any]:
         """Decide whether to continue searching or finish"""
         
         self._verbose_print("STEP 5: Decision Making", "Deciding whether to continue or finish...")
         
-        decision_prompt = f"""
-        Based on the reflection: {state['reflection']}
-        Current iteration: {state['iteration_count']}
-        
-        Should we:
-        - CONTINUE searching (if more information needed, max 3 iterations)
-        - FINISH and synthesize answer (if sufficient information gathered)
-        
-        Decision:"""
-        
-        response = self.llm.invoke([HumanMessage(content=decision_prompt)])
+        text = state['reflection'].lower()
+        signals_continue = any(signal in text for signal in CONTINUE_SIGNALS)
+        signals_finish = any(signal in text for signal in FINISH_SIGNALS)
         
-        # Determine next action
-        should_continue = (
-            "CONTINUE" in response.content.upper() and 
-            state["iteration_count"] < 3
-        )
+        if state["iteration_count"] >= MAX_SEARCH_ITERATIONS:
+            should_continue = False
+            self._verbose_print("Decision Heuristic", "Iteration limit reached")
+        elif signals_continue or signals_finish:
+            should_continue = signals_continue and not signals_finish
+            self._verbose_print("Decision Heuristic", "Decided from reflection keywords, LLM call skipped")
+        else:
+            # Ambiguous reflection - let the LLM decide
+            messages = self._decide_tmpl.format_messages(
+                iteration_count=state['iteration_count'],
+                reflection=state['reflection']
+            )
+            
+            cache_key = self._node_cache_key("decide", messages[-1].content)
+            decision = _NODE_CACHE.get(cache_key)
+            if decision is None:
+                response = await self.routing_llm.ainvoke(messages, max_tokens=ROUTING_MAX_TOKENS)
+                label = _routing_label(response, ("CONTINUE", "FINISH"))
+                decision = label or "FINISH"
+                if label:
+                    self._cache_node_result(cache_key, decision)
+            else:
+                self._verbose_print("Decision Cache", "Reusing decision for identical reflection")
+            
+            should_continue = decision == "CONTINUE"
+            self._verbose_print("Decision LLM", f"LLM decision: {decision}")
         
         next_action = "continue" if should_continue else "finish"
         
@@ -258,58 +749,45 @@ class AdvancedResearchAgent(AgentInterface):
             self._verbose_print("", "Moving to synthesis phase")
         
         return {
-            "messages": [AIMessage(content=f"Decision: {next_action}")],
             "next_action": next_action
         }
     
-    def _should_continue(self, state: AgentState) -> Literal["continue", "finish"]:
+    @staticmethod
+    def _should_continue(state: AgentState) -> Literal["continue", "finish"]:
         """Determine if should continue or finish"""
         return state.get("next_action", "finish")
     
-    def _synthesize_answer(self, state: AgentState) -> Dict[str, Any]:
+    async def _synthesize_answer(self, state: AgentState) -> Dict[str, Any]:
         """Synthesize the final answer from all gathered information"""
         
         self._verbose_print("STEP 6: Final Synthesis", "Combining all research into comprehensive answer...")
         
-        synthesis_prompt = f"""
-        Original query: {state['query']}
-        
-        Research conducted:
-        {state.get('research_plan', 'No research plan')}
-        
-        Search results:
-        {chr(10).join(state.get('search_results', []))}
-        
-        Reflection:
-        {state.get('reflection', 'No reflection')}
-        
-        Provide a comprehensive, well-structured answer to the original query based on all the research gathered.
-        Include:
-        1. Direct answer to the question
-        2. Supporting evidence from research
-        3. Any important caveats or limitations
-        
-        IMPORTANT: Answer in the same language as the original query.
-        
-        Final Answer:"""
+        messages = self._synth_tmpl.format_messages(
+            query=state['query'],
+            research_plan=state.get('research_plan', 'No research plan'),
+            search_results=self._compact_search_results(self._relevant_snippets(state)),
+            reflection=state.get('reflection', 'No reflection')
+        )
         
-        response = self.llm.invoke([HumanMessage(content=synthesis_prompt)])
+        # ainvoke goes through the LLM cache; under astream_events the model still
+        # streams, so process_stream() can forward tokens as they arrive
+        response = await self.llm.ainvoke(messages)
+        answer = response.content
         
         self._verbose_print("Synthesis Complete", "Final answer generated successfully!")
         
         return {
-            "messages": [AIMessage(content=response.content)],
-            "final_answer": response.content
+            "final_answer": answer
         }
     
-    def _generate_partial_answer(self, state: AgentState) -> str:
+    async def _generate_partial_answer(self, state: AgentState) -> str:
         """Generate a partial answer when iteration limit is reached"""
         
         # Check if we have any partial data to work with
         partial_data = {
             "query": state.get("query", ""),
             "research_plan": state.get("research_plan", ""),
-            "search_results": state.get("search_results", []),
+            "search_results": (state.get("search_results") or _empty_search_results())["snippets"],
             "reflection": state.get("reflection", ""),
             "iteration_count": state.get("iteration_count", 0)
         }
@@ -328,6 +806,11 @@ Unfortunately, I reached the maximum allowed number of steps ({self.recursion_li
 Due to the iteration limit, I was unable to conduct proper research. Please increase the iteration limit in the configuration (graph.recursion_limit) or reformulate the query to be more specific."""
         
         # Generate actual draft answer using available data
+        if partial_data['search_results']:
+            search_results = self._compact_search_results(self._relevant_snippets(state))
+        else:
+            search_results = 'No search results available'
+        
         draft_synthesis_prompt = f"""
         User query: {partial_data['query']}
         
@@ -336,8 +819,8 @@ Due to the iteration limit, I was unable to conduct proper research. Please incr
         Research plan:
         {partial_data.get('research_plan', 'No research plan available')}
         
-        Search results from {len(partial_data['search_results'])} iteration(s):
-        {chr(10).join(partial_data['search_results']) if partial_data['search_results'] else 'No search results available'}
+        Search results from {partial_data['iteration_count']} iteration(s):
+        {search_results}
         
         Last reflection:
         {partial_data.get('reflection', 'No reflection available')}
@@ -359,7 +842,7 @@ Due to the iteration limit, I was unable to conduct proper research. Please incr
         Draft response:"""
         
         try:
-            response = self.llm.invoke([HumanMessage(content=draft_synthesis_prompt)])
+            response = await self.llm.ainvoke([HumanMessage(content=draft_synthesis_prompt)])
             return response.content
         except Exception as e:
             # Fallback if LLM call fails
@@ -386,7 +869,7 @@ This is a preliminary answer based on limited research data. I reached the maxim
 **Research Status:**
 • Iterations completed: {partial_data['iteration_count']} of {self.recursion_limit} (limit reached)
 • Research plan: {'✅ Created' if partial_data['research_plan'] else '❌ Not created'}
-• Search operations: {len(partial_data['search_results'])} completed
+• Search operations: {partial_data['iteration_count']} completed
 • Analysis depth: {'Partial' if partial_data['reflection'] else 'Minimal'}
 
 **To get a complete answer:**
@@ -394,67 +877,114 @@ This is a preliminary answer based on limited research data. I reached the maxim
 2. Try a more specific query
 3. Re-run the research with current settings"""
     
-    def process(self, query: str, thread_id: str = "default") -> str:
-        """Execute the research workflow"""
-        
+    def _initial_state(self, query: str) -> Dict[str, Any]:
+        """Build the initial workflow state for a query"""
+        # Lists and search results are updated in place, so only those are created per query
+        return {
+            **self._INITIAL_STATE,
+            "messages": [HumanMessage(content=query)],
+            "query": query,
+            "search_queries": [],
+            "search_results": _empty_search_results()
+        }
+    
+    def _start_run(self, query: str, thread_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Print the run header and return initial state and graph config with a fresh run context"""
         if self.verbose:
             print(f"\n🎯 Starting Advanced Research Workflow")
             print(f"📝 Query: {query}")
             print(f"🧵 Thread: {thread_id}")
             print("=" * 60)
         
-        initial_state = {
-            "messages": [HumanMessage(content=query)],
-            "query": query,
-            "research_plan": "",
-            "search_results": [],
-            "reflection": "",
-            "next_action": "",
-            "iteration_count": 0,
-            "final_answer": ""
-        }
-        
         config = {
-            "configurable": {"thread_id": thread_id},
+            "configurable": {"thread_id": thread_id, "agent": self, "run": _RunContext()},
             "recursion_limit": self.recursion_limit
         }
+        if self.checkpointer is not None:
+            from langgraph.constants import CONFIG_KEY_CHECKPOINT_DURING
+            
+            # Runs are never resumed mid-workflow, so only the final state is checkpointed
+            config["configurable"][CONFIG_KEY_CHECKPOINT_DURING] = False
+        return self._initial_state(query), config
+    
+    async def _recover_from_recursion_limit(self, error: "GraphRecursionError", initial_state: Dict[str, Any],
+                                            config: Dict[str, Any]) -> str:
+        """Generate a draft answer from the last tracked state after the recursion limit was hit"""
+        if self.verbose:
+            print(f"\n⚠️ GraphRecursionError caught: {str(error)}")
+            print("🔄 Switching to partial answer generation...")
+        
+        current_state = config["configurable"]["run"].last_state or initial_state
+        if self.verbose:
+            print(f"📊 Using last tracked state: iteration {current_state.get('iteration_count', 0)}")
+        
+        # Generate partial answer
+        return IncompleteAnswer(await self._generate_partial_answer(current_state))
+    
+    def _unexpected_error(self, error: Exception) -> str:
+        """Report an unexpected workflow error"""
+        if self.verbose:
+            print(f"\n❌ Unexpected error during research: {str(error)}")
+        return IncompleteAnswer(f"An unexpected error occurred during research: {str(error)}. Please try again.")
+    
+    def process(self, query: str, thread_id: str = "default") -> str:
+        """Execute the research workflow"""
+        return run_sync(self.aprocess(query, thread_id))
+    
+    async def aprocess(self, query: str, thread_id: str = "default") -> str:
+        """Execute the research workflow asynchronously"""
+        from langgraph.errors import GraphRecursionError
+        
+        initial_state, config = self._start_run(query, thread_id)
         
         try:
             # Execute the workflow
-            result = self.graph.invoke(initial_state, config)
-            return result.get("final_answer", "No answer generated")
+            result = await self.graph.ainvoke(initial_state, config)
+            return result.get("final_answer") or IncompleteAnswer("No answer generated")
             
         except GraphRecursionError as e:
-            if self.verbose:
-                print(f"\n⚠️ GraphRecursionError caught: {str(e)}")
-                print("🔄 Switching to partial answer generation...")
-            
-            # Get the current state from the graph if possible
-            try:
-                # Try to get the last checkpoint to access current state
-                checkpoints = list(self.graph.get_state_history(config))
-                if checkpoints:
-                    current_state = checkpoints[0].values
-                    if self.verbose:
-                        print(f"📊 Retrieved state from checkpoint: iteration {current_state.get('iteration_count', 0)}")
-                else:
-                    current_state = initial_state
-                    if self.verbose:
-                        print("📊 Using initial state (no checkpoints found)")
-            except Exception as checkpoint_error:
-                if self.verbose:
-                    print(f"⚠️ Could not retrieve state from checkpoint: {str(checkpoint_error)}")
-                current_state = initial_state
-            
-            # Generate partial answer
-            partial_answer = self._generate_partial_answer(current_state)
-            return partial_answer
+            return await self._recover_from_recursion_limit(e, initial_state, config)
             
         except Exception as e:
-            if self.verbose:
-                print(f"\n❌ Unexpected error during research: {str(e)}")
-            return f"An unexpected error occurred during research: {str(e)}. Please try again."
+            return self._unexpected_error(e)
+    
+    def process_stream(self, query: str, thread_id: str = "default") -> Iterator[str]:
+        """Execute the research workflow, yielding the final answer as it is generated"""
+        yield from iterate_sync(self.aprocess_stream(query, thread_id))
+    
+    async def aprocess_stream(self, query: str, thread_id: str = "default") -> AsyncIterator[str]:
+        """
+        Execute the research workflow asynchronously, yielding the final answer as it is generated.
+        
+        Research steps run as usual; only tokens of the synthesis step are forwarded.
+        """
+        from langgraph.errors import GraphRecursionError
+        
+        initial_state, config = self._start_run(query, thread_id)
+        
+        streamed = False
+        try:
+            async for event in self.graph.astream_events(initial_state, config, version="v2"):
+                if event["event"] == "on_chat_model_stream" and \
+                        event["metadata"].get("langgraph_node") == "synthesize_answer":
+                    content = event["data"]["chunk"].content
+                    if isinstance(content, str) and content:
+                        streamed = True
+                        yield content
+                elif event["event"] == "on_chain_end" and not event["parent_ids"] and not streamed:
+                    # Model did not stream - emit the complete answer from the final state
+                    output = event["data"].get("output") or {}
+                    yield output.get("final_answer") or IncompleteAnswer("No answer generated")
+        
+        except GraphRecursionError as e:
+            yield await self._recover_from_recursion_limit(e, initial_state, config)
+        
+        except Exception as e:
+            yield self._unexpected_error(e)
+
 
-def create_advanced_agent(llm: BaseLanguageModel, tools: List[BaseTool], verbose: bool = True, recursion_limit: int = 50) -> AdvancedResearchAgent:
+def create_advanced_agent(llm: BaseLanguageModel, tools: List[BaseTool], verbose: bool = True, recursion_limit: int = 50,
+                          enable_checkpoints: bool = False,
+                          routing_llm: Optional[BaseLanguageModel] = None) -> AdvancedResearchAgent:
     """Create an advanced research agent with controlled workflow"""
-    return AdvancedResearchAgent(llm, tools, verbose, recursion_limit) 
\ No newline at end of file
+    return AdvancedResearchAgent(llm, tools, verbose, recursion_limit, enable_checkpoints, routing_llm) 
\ No newline at end of file
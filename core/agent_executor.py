@@ -0,0 +1,78 @@
+"""
+Agent Executor - AgentExecutor variant that runs each distinct tool call only once per query
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentStep
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun, CallbackManagerForChainRun
+from langchain_core.tools import BaseTool
+
+
+# Observations of the current run, so concurrent runs of one executor stay separate
+_tool_results: ContextVar[Optional[Dict[Tuple[str, str], Any]]] = ContextVar("tool_results", default=None)
+
+
+def _tool_call_key(agent_action: AgentAction) -> Tuple[str, str]:
+    """Build a hashable key from tool name and (possibly nested) tool input"""
+    tool_input = agent_action.tool_input
+    if not isinstance(tool_input, str):
+        tool_input = json.dumps(tool_input, sort_keys=True, default=str)
+    return agent_action.tool, tool_input
+
+
+@contextmanager
+def _dedup_run() -> Iterator[Dict[Tuple[str, str], Any]]:
+    """Collect tool observations for one run in the current context"""
+    results: Dict[Tuple[str, str], Any] = {}
+    token = _tool_results.set(results)
+    try:
+        yield results
+    finally:
+        _tool_results.reset(token)
+
+
+class DedupAgentExecutor(AgentExecutor):
+    """AgentExecutor that reuses observations of identical tool calls within a single run"""
+
+    def _call(self, inputs: Dict[str, str],
+              run_manager: Optional[CallbackManagerForChainRun] = None) -> Dict[str, Any]:
+        with _dedup_run():
+            return super()._call(inputs, run_manager=run_manager)
+
+    async def _acall(self, inputs: Dict[str, str],
+                     run_manager: Optional[AsyncCallbackManagerForChainRun] = None) -> Dict[str, str]:
+        with _dedup_run():
+            return await super()._acall(inputs, run_manager=run_manager)
+
+    def _perform_agent_action(self, name_to_tool_map: Dict[str, BaseTool], color_mapping: Dict[str, str],
+                              agent_action: AgentAction,
+                              run_manager: Optional[CallbackManagerForChainRun] = None) -> AgentStep:
+        results = _tool_results.get()
+        key = _tool_call_key(agent_action)
+        if results is None or agent_action.tool not in name_to_tool_map:
+            results = {}
+        elif key in results:
+            return AgentStep(action=agent_action, observation=results[key])
+
+        step = super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        results[key] = step.observation
+        return step
+
+    async def _aperform_agent_action(self, name_to_tool_map: Dict[str, BaseTool], color_mapping: Dict[str, str],
+                                     agent_action: AgentAction,
+                                     run_manager: Optional[AsyncCallbackManagerForChainRun] = None) -> AgentStep:
+        results = _tool_results.get()
+        key = _tool_call_key(agent_action)
+        if results is None or agent_action.tool not in name_to_tool_map:
+            results = {}
+        elif key in results:
+            return AgentStep(action=agent_action, observation=results[key])
+
+        step = await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        results[key] = step.observation
+        return step
@@ -2,39 +2,138 @@
 Agent Factory - module responsible for creating agents based on configuration
 """
 
-from typing import Dict, Any, List, Optional
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.tools import BaseTool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain.agents import AgentExecutor
-from langchain.agents.format_scratchpad import format_to_openai_function_messages, format_to_tool_messages
-from langchain.agents.openai_functions_agent.base import OpenAIFunctionsAgentOutputParser
-from langchain.agents.tool_calling_agent.base import ToolsAgentOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 
-class AgentFactory:
-    """Agent factory supporting various configurations."""
+from .compact_serializer import dumps, to_compact
+
+# langchain.agents and the provider packages are imported where they are used,
+# so importing this module does not pay for providers that are never instantiated
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+
+
+def _is_model(llm: BaseLanguageModel, module_name: str, class_name: str) -> bool:
+    """
+    Check whether llm is an instance of module_name.class_name without importing the module.
     
-    @staticmethod
-    def create_agent(llm: BaseLanguageModel, tools: List[BaseTool]) -> AgentExecutor:
-        """
-        Create agent based on LLM model and tools.
+    An instance can only exist if its provider package was already imported.
+    """
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(llm, getattr(module, class_name))
+
+# Serialized tool definitions keyed by id(tool); the weak reference guards
+# against a recycled id pointing at a different tool
+_TOOL_JSON_CACHE: Dict[int, Tuple[weakref.ref, Dict[str, Any]]] = {}
+
+
+def _tool_json(tool: BaseTool) -> Dict[str, Any]:
+    """Return compacted tool.to_json(), serializing each tool instance only once"""
+    cached = _TOOL_JSON_CACHE.get(id(tool))
+    if cached is not None and cached[0]() is tool:
+        return cached[1]
+    
+    serialized = to_compact(tool.to_json())
+    _TOOL_JSON_CACHE[id(tool)] = (weakref.ref(tool), serialized)
+    return serialized
+
+
+# LLMs already bound to a tool set, keyed by (id(llm), ids of tools). The entry keeps
+# the tools alive (the binding keeps the llm alive) so the ids cannot be recycled while
+# it is cached; least recently used entries are dropped so replaced models are released.
+_BOUND_LLM_CACHE: "OrderedDict[Tuple[int, Tuple[int, ...]], Tuple[Tuple[BaseTool, ...], Runnable]]" = OrderedDict()
+_BOUND_LLM_CACHE_SIZE = 32
+_bound_llm_lock = threading.Lock()
+
+
+def _bind_tools(llm: BaseLanguageModel, tools: List[BaseTool]) -> Runnable:
+    """Bind tools to the LLM once per (llm, tools) combination"""
+    key = (id(llm), tuple(id(tool) for tool in tools))
+    with _bound_llm_lock:
+        cached = _BOUND_LLM_CACHE.get(key)
+        if cached is not None:
+            _BOUND_LLM_CACHE.move_to_end(key)
+            return cached[1]
+    
+    if _is_model(llm, "langchain_openai", "ChatOpenAI"):
+        bound = llm.bind(functions=[_tool_json(tool) for tool in tools])
+    else:
+        bound = llm.bind_tools(tools)
+    
+    with _bound_llm_lock:
+        _BOUND_LLM_CACHE[key] = (tuple(tools), bound)
+        while len(_BOUND_LLM_CACHE) > _BOUND_LLM_CACHE_SIZE:
+            _BOUND_LLM_CACHE.popitem(last=False)
+    return bound
+
+
+def _serialize_steps(intermediate_steps: List[Tuple[Any, Any]]) -> List[Tuple[Any, str]]:
+    """
+    Turn non-string tool observations into compact JSON before they enter the scratchpad.
+    
+    Only whitespace is dropped: empty values are kept, since an empty result list
+    tells the model the tool found nothing.
+    """
+    return [
+        (action, observation if isinstance(observation, str) else dumps(observation))
+        for action, observation in intermediate_steps
+    ]
+
+
+class _IncrementalScratchpad:
+    """
+    Scratchpad formatter that only formats steps added since the previous call.
+    
+    AgentExecutor passes the growing intermediate_steps list on every step; formatting
+    it from scratch each time is quadratic in the number of steps. One agent may serve
+    several runs at once, so progress is tracked per run, keyed by its steps list.
+    """
+    
+    MAX_RUNS = 32
+    
+    def __init__(self, format_steps: Callable[[List[Tuple[Any, str]]], List[BaseMessage]]):
+        self.format_steps = format_steps
+        # id(steps) -> (last formatted step, number of formatted steps, messages)
+        self._runs: "OrderedDict[int, Tuple[Any, int, List[BaseMessage]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __call__(self, inputs: Dict[str, Any]) -> List[BaseMessage]:
+        steps = inputs.get("intermediate_steps", [])
+        if not steps:
+            return []
         
-        Args:
-            llm: Language model
-            tools: List of tools
-            
-        Returns:
-            Agent executor (AgentExecutor)
-        """
-        # Define prompt
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", """You are a helpful, friendly assistant. You respond in English.
+        key = id(steps)
+        with self._lock:
+            last_step, count, messages = self._runs.get(key, (None, 0, []))
+        
+        # Start over when the steps are not a continuation of what was formatted (new run)
+        if count == 0 or len(steps) < count or steps[count - 1] is not last_step:
+            count, messages = 0, []
+        
+        new_steps = steps[count:]
+        if new_steps:
+            messages = messages + self.format_steps(_serialize_steps(new_steps))
+            with self._lock:
+                self._runs[key] = (steps[-1], len(steps), messages)
+                self._runs.move_to_end(key)
+                while len(self._runs) > self.MAX_RUNS:
+                    self._runs.popitem(last=False)
+        return messages
+
+
+# Static system instructions. Kept first in the prompt so the identical prefix
+# can be served from provider-side prompt caches; dynamic content follows it.
+_SYSTEM_PROMPT = """You are a helpful, friendly assistant. You respond in English.
                 Use available tools when you need to find information,
                 but if you know the answer directly, respond without using tools.
                 Your responses are concise and specific.
@@ -48,54 +147,94 @@ class AgentFactory:
                 
                 EXAMPLE: If you want to use the Search tool, call it with the query parameter value "your search query"
                 
-                NEVER call a tool without providing the required parameters."""),
-                MessagesPlaceholder("chat_history", optional=True),
-                ("human", "{input}"),
-                MessagesPlaceholder("agent_scratchpad"),
-            ]
+                NEVER call a tool without providing the required parameters."""
+
+
+@lru_cache(maxsize=2)
+def _agent_prompt(cache_control: bool = False) -> ChatPromptTemplate:
+    """
+    Build the agent prompt template once.
+    
+    Args:
+        cache_control: Mark the system prompt (and the tool definitions sent before it)
+            as cacheable; Anthropic caches prompt prefixes only when asked to
+    """
+    if cache_control:
+        system = SystemMessage(
+            content=[{"type": "text", "text": _SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
         )
+    else:
+        system = ("system", _SYSTEM_PROMPT)
+    return ChatPromptTemplate.from_messages(
+        [
+            system,
+            MessagesPlaceholder("chat_history", optional=True),
+            ("human", "{input}"),
+            MessagesPlaceholder("agent_scratchpad"),
+        ]
+    )
+
+
+class AgentFactory:
+    """Agent factory supporting various configurations."""
+    
+    @staticmethod
+    def create_agent(llm: BaseLanguageModel, tools: List[BaseTool]) -> "AgentExecutor":
+        """
+        Create agent based on LLM model and tools.
+        
+        Args:
+            llm: Language model
+            tools: List of tools
+            
+        Returns:
+            Agent executor (AgentExecutor)
+        """
+        from .agent_executor import DedupAgentExecutor
         
         # Set up model to use tools
-        if isinstance(llm, ChatOpenAI):
+        if _is_model(llm, "langchain_openai", "ChatOpenAI"):
             # Preparation for OpenAI
-            llm_with_tools = llm.bind(functions=[tool.to_json() for tool in tools])
+            from langchain.agents.format_scratchpad import format_to_openai_function_messages
+            from langchain.agents.openai_functions_agent.base import OpenAIFunctionsAgentOutputParser
+            
+            llm_with_tools = _bind_tools(llm, tools)
             
             # Define chain
             agent = (
                 {
                     "input": lambda x: x["input"],
                     "chat_history": lambda x: x.get("chat_history", []),
-                    "agent_scratchpad": lambda x: format_to_openai_function_messages(
-                        x.get("intermediate_steps", [])
-                    ),
+                    "agent_scratchpad": _IncrementalScratchpad(format_to_openai_function_messages),
                 }
-                | prompt
+                | _agent_prompt()
                 | llm_with_tools
                 | OpenAIFunctionsAgentOutputParser()
             )
-        elif isinstance(llm, ChatAnthropic):
+        elif _is_model(llm, "langchain_anthropic", "ChatAnthropic"):
             # Preparation for Claude
-            llm_with_tools = llm.bind_tools(tools)
+            from langchain.agents.format_scratchpad import format_to_tool_messages
+            from langchain.agents.tool_calling_agent.base import ToolsAgentOutputParser
+            
+            llm_with_tools = _bind_tools(llm, tools)
             
             # Define chain for Claude with message formatting
             agent = (
                 {
                     "input": lambda x: x["input"],
                     "chat_history": lambda x: x.get("chat_history", []),
-                    "agent_scratchpad": lambda x: format_to_tool_messages(
-                        x.get("intermediate_steps", [])
-                    ),
+                    "agent_scratchpad": _IncrementalScratchpad(format_to_tool_messages),
                 }
-                | prompt
+                | _agent_prompt(cache_control=True)
                 | llm_with_tools
                 | ToolsAgentOutputParser()
             )
         else:
             # For other models use standard tool binding
-            agent = llm.bind_tools(tools)
+            agent = _bind_tools(llm, tools)
         
         # Create agent executor
-        agent_executor = AgentExecutor.from_agent_and_tools(
+        agent_executor = DedupAgentExecutor.from_agent_and_tools(
             agent=agent,
             tools=tools,
             verbose=True,
@@ -2,8 +2,19 @@
 Common interface for all agent implementations
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
+
+
+class IncompleteAnswer(str):
+    """
+    Answer text returned when a query could not be fully answered.
+    
+    Agents report errors and partial (draft) answers as text, so callers that only
+    display the answer need no special handling; callers that persist answers can
+    recognize these by type and skip them.
+    """
 
 
 class AgentInterface(ABC):
@@ -23,6 +34,36 @@ class AgentInterface(ABC):
         """
         pass
     
+    async def aprocess(self, query: str, thread_id: str = "default") -> str:
+        """
+        Process a user query asynchronously
+        
+        Agents without native async support run process() in a worker thread.
+        
+        Args:
+            query: User's input query
+            thread_id: Thread/session identifier for context management
+            
+        Returns:
+            String response to the query
+        """
+        return await asyncio.to_thread(self.process, query, thread_id)
+    
+    def process_stream(self, query: str, thread_id: str = "default") -> Iterator[str]:
+        """
+        Process a user query and yield the response in chunks as it is generated
+        
+        Agents that cannot stream yield the complete response as a single chunk.
+        
+        Args:
+            query: User's input query
+            thread_id: Thread/session identifier for context management
+            
+        Yields:
+            Consecutive fragments of the response
+        """
+        yield self.process(query, thread_id)
+    
     @property
     @abstractmethod
     def name(self) -> str:
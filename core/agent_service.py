@@ -3,11 +3,20 @@ Core Agent Service
 Centralizes agent management with logging capabilities
 """
 
+import asyncio
+import atexit
 import logging
+import os
+import queue
+import secrets
+import threading
 import time
+from collections import deque
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Union
 from io import StringIO
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import sys
 
 from langchain_core.language_models import BaseLanguageModel
@@ -15,43 +24,151 @@ from langchain_core.tools import BaseTool
 
 from .advanced_agent import create_advanced_agent
 from .standard_agent import create_standard_agent
+from .agent_interface import IncompleteAnswer
+from .response_cache import ResponseCache
+
+
+# Capture targets (stdout, stderr) of the LogCapture active in the current context.
+# Threads started with asyncio.to_thread inherit a copy, so concurrent queries
+# each write into their own buffer.
+_capture_targets: ContextVar[Optional[tuple]] = ContextVar("capture_targets", default=None)
+
+_redirect_lock = threading.Lock()
+_redirect_count = 0
+_saved_streams: Optional[tuple] = None
+
+
+class _ContextRoutedStream:
+    """Stream proxy that writes to the capture target of the current context"""
+    
+    def __init__(self, fallback, index: int):
+        self.fallback = fallback
+        self.index = index
+    
+    def _target(self):
+        targets = _capture_targets.get()
+        return targets[self.index] if targets is not None else self.fallback
+    
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+def _install_redirect():
+    """Route sys.stdout/sys.stderr through context-aware proxies while any capture is active"""
+    global _redirect_count, _saved_streams
+    with _redirect_lock:
+        if _redirect_count == 0:
+            _saved_streams = (sys.stdout, sys.stderr)
+            sys.stdout = _ContextRoutedStream(sys.stdout, 0)
+            sys.stderr = _ContextRoutedStream(sys.stderr, 1)
+        _redirect_count += 1
+
+
+def _uninstall_redirect():
+    """Restore the original streams once the last capture has finished"""
+    global _redirect_count
+    with _redirect_lock:
+        _redirect_count -= 1
+        if _redirect_count == 0:
+            sys.stdout, sys.stderr = _saved_streams
+
+
+# Date and time part of the current second, formatted once per second
+_timestamp_second = (0, "")
+
+
+def _timestamp() -> str:
+    """Return the current local time in ISO 8601 format with microseconds"""
+    global _timestamp_second
+    second, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _timestamp_second
+    if cached_second != second:
+        prefix = datetime.fromtimestamp(second).strftime("%Y-%m-%dT%H:%M:%S")
+        _timestamp_second = (second, prefix)
+    return f"{prefix}.{nanoseconds // 1000:06d}"
+
+
+
+def _shorten(text: str, limit: int = 100) -> str:
+    """Cut text for log lines, marking it only when something was cut"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+def _new_thread_id() -> str:
+    """Return a thread ID for a query that did not supply one"""
+    # The random suffix keeps queries started within the same second apart
+    return f"session_{int(time.time())}_{secrets.token_hex(6)}"
+
+# Upper bound on the output captured for one query; beyond it the oldest output is dropped
+MAX_CAPTURED_CHARS = 256 * 1024
+
+# Upper bound on the log lines kept for one query; older lines are dropped first
+MAX_LOG_LINES = int(os.environ.get("AGENT_MAX_LOG_LINES", "2000"))
+
+
+class _CaptureBuffer(StringIO):
+    """StringIO that keeps only the most recent output once it grows past MAX_CAPTURED_CHARS"""
+    
+    def __init__(self):
+        super().__init__()
+        self.truncated = False
+    
+    def write(self, text):
+        if self.tell() + len(text) <= MAX_CAPTURED_CHARS:
+            return super().write(text)
+        
+        # Slide the window: keep the newest half so trimming happens rarely
+        kept = (self.getvalue() + text)[-(MAX_CAPTURED_CHARS // 2):]
+        self.seek(0)
+        self.truncate()
+        super().write(kept)
+        self.truncated = True
+        return len(text)
 
 
 class LogCapture:
     """Captures print statements and logs during agent execution"""
     
     def __init__(self, show_live: bool = False):
-        self.logs = []
-        self.original_stdout = sys.stdout
-        self.original_stderr = sys.stderr
-        self.string_io = StringIO()
+        self.logs: deque = deque(maxlen=MAX_LOG_LINES)
+        self.string_io = _CaptureBuffer()
         self.show_live = show_live
         
     def __enter__(self):
+        _install_redirect()
         if self.show_live:
             # For CLI - show output live and capture it
-            self.tee_stdout = TeeOutput(self.original_stdout, self.string_io)
-            self.tee_stderr = TeeOutput(self.original_stderr, self.string_io)
-            sys.stdout = self.tee_stdout
-            sys.stderr = self.tee_stderr
+            self.tee_stdout = TeeOutput(_saved_streams[0], self.string_io)
+            self.tee_stderr = TeeOutput(_saved_streams[1], self.string_io)
+            self._token = _capture_targets.set((self.tee_stdout, self.tee_stderr))
         else:
             # For API - only capture, don't show
-            sys.stdout = self.string_io
-            sys.stderr = self.string_io
+            self._token = _capture_targets.set((self.string_io, self.string_io))
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout = self.original_stdout
-        sys.stderr = self.original_stderr
+        _capture_targets.reset(self._token)
+        _uninstall_redirect()
+        if self.show_live:
+            # Forward any output still held back without a trailing newline
+            self.tee_stdout.flush()
+            self.tee_stderr.flush()
         
         # Capture all output
-        output = self.string_io.getvalue()
-        if output.strip():
-            self.logs.append(output.strip())
+        output = self.string_io.getvalue().strip()
+        if output:
+            if self.string_io.truncated:
+                output = f"[Earlier output truncated]\n{output}"
+            self.logs.append(output)
     
     def add_log(self, message: str):
         """Add a log message manually"""
-        timestamp_msg = f"{datetime.now().isoformat()}: {message}"
+        timestamp_msg = f"{_timestamp()}: {message}"
         self.logs.append(timestamp_msg)
         # If showing live, also print to console
         if self.show_live:
@@ -59,34 +176,133 @@ class LogCapture:
     
     def get_logs(self) -> List[str]:
         """Get all captured logs"""
-        return self.logs.copy()
+        return list(self.logs)
 
 
 class TeeOutput:
-    """Write to both original stream and string buffer"""
+    """Write to both original stream and string buffer, a line at a time"""
+    
+    # Text without a newline is held back until this many characters are pending
+    BUFFER_SIZE = 4096
     
     def __init__(self, original_stream, string_buffer):
         self.original_stream = original_stream
         self.string_buffer = string_buffer
+        self._pending: List[str] = []
+        self._pending_size = 0
     
     def write(self, text):
-        self.original_stream.write(text)
-        self.string_buffer.write(text)
+        self._pending.append(text)
+        self._pending_size += len(text)
+        # print() writes the text and its newline separately, so both reach the sinks in one write
+        if "\n" in text or self._pending_size >= self.BUFFER_SIZE:
+            self._emit()
         return len(text)
     
+    def writelines(self, lines):
+        self._pending.extend(lines)
+        self._emit()
+    
+    def _emit(self):
+        """Forward pending text to both sinks"""
+        pending, self._pending = self._pending, []
+        self._pending_size = 0
+        if pending:
+            chunk = "".join(pending)
+            self.original_stream.write(chunk)
+            self.string_buffer.write(chunk)
+    
     def flush(self):
+        self._emit()
         self.original_stream.flush()
         self.string_buffer.flush()
 
 
+_file_logger_lock = threading.Lock()
+
+
+def _file_logger() -> logging.Logger:
+    """
+    Return the service file logger, configuring it on first use.
+    
+    Records are handed to a background listener thread through a queue, so
+    requests never wait on file writes. The file rolls over at midnight and
+    earlier days are kept as logs/agent_logs_YYYYMMDD.log.
+    """
+    logger = logging.getLogger("agent_service")
+    with _file_logger_lock:
+        if logger.handlers:
+            return logger
+        
+        # Create logs directory if it doesn't exist
+        os.makedirs("logs", exist_ok=True)
+        
+        file_handler = TimedRotatingFileHandler("logs/agent_logs.log", when="midnight", encoding='utf-8')
+        file_handler.suffix = "%Y%m%d"
+        file_handler.namer = lambda name: name.replace(".log.", "_") + ".log"
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+        
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+# Static descriptions of the agent types and their parameters; the recursion
+# limit default is filled in from the service configuration
+AGENT_DESCRIPTIONS = {
+    "standard": "Standard LangChain AgentExecutor with OpenAI function calling and direct tool usage",
+    "advanced": "Advanced research agent with multi-step workflow including planning, reflection, and synthesis"
+}
+
+_VERBOSE_PARAMETER = {
+    "type": "boolean",
+    "default": False,
+    "description": "Enable verbose output"
+}
+
+AGENT_PARAMETERS = {
+    "advanced": {
+        "recursion_limit": {
+            "type": "integer",
+            "default": None,
+            "description": "Maximum number of steps in workflow"
+        },
+        "verbose": _VERBOSE_PARAMETER
+    },
+    "standard": {
+        "verbose": _VERBOSE_PARAMETER
+    }
+}
+
+
+# Answers sampled above this temperature vary between runs, so they are not cached
+MAX_CACHEABLE_TEMPERATURE = 0.1
+
+
 class AgentService:
     """Service for managing different types of agents with centralized logging"""
     
     def __init__(self, llm: BaseLanguageModel, tools: List[BaseTool], 
-                 default_recursion_limit: int = 50):
+                 default_recursion_limit: int = 50, response_cache: Optional[ResponseCache] = None,
+                 routing_llm: Optional[BaseLanguageModel] = None):
         self.llm = llm
+        self.routing_llm = routing_llm
         self.tools = tools
+        # Tools are fixed for the service, so their names are collected once; responses get a list copy
+        self._tool_names = tuple(tool.name for tool in tools)
         self.default_recursion_limit = default_recursion_limit
+        self.response_cache = response_cache
+        
+        # Agents are reused across queries, one per distinct configuration
+        self._agents: Dict[tuple, Any] = {}
+        self._agents_lock = threading.Lock()
         
         # Setup file logging
         self._setup_logging()
@@ -96,31 +312,14 @@ class AgentService:
             "standard": "🔧 Standard LangChain Agent",
             "advanced": "🔬 Advanced Research Agent"
         }
+        self._agent_factories = {
+            "standard": self._new_standard_agent,
+            "advanced": self._new_advanced_agent
+        }
     
     def _setup_logging(self):
         """Setup daily log files"""
-        today = datetime.now().strftime("%Y%m%d")
-        log_filename = f"logs/agent_logs_{today}.log"
-        
-        # Create logs directory if it doesn't exist
-        import os
-        os.makedirs("logs", exist_ok=True)
-        
-        # Setup file logger
-        self.file_logger = logging.getLogger("agent_service")
-        self.file_logger.setLevel(logging.INFO)
-        
-        # Remove existing handlers to avoid duplicates
-        for handler in self.file_logger.handlers[:]:
-            self.file_logger.removeHandler(handler)
-        
-        # Add file handler
-        file_handler = logging.FileHandler(log_filename, encoding='utf-8')
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        self.file_logger.addHandler(file_handler)
+        self.file_logger = _file_logger()
     
     def get_available_agent_types(self) -> Dict[str, str]:
         """Get available agent types"""
@@ -133,23 +332,64 @@ class AgentService:
             "advanced": "Advanced multi-step workflow with planning and reflection"
         }
     
-    def _create_agent(self, agent_type: str, show_live_output: bool = False, **kwargs):
-        """Create agent based on type and parameters"""
+    def _cache_for(self, kwargs: Dict[str, Any]) -> Optional[ResponseCache]:
+        """
+        Return the response cache if it applies to a request.
         
-        if agent_type == "standard":
-            # For CLI with live output, enable verbose. For API, keep it false to capture properly
-            verbose = kwargs.get("verbose", show_live_output)
-            return create_standard_agent(self.llm, self.tools, verbose=verbose)
+        The 'cache' keyword (default True) is removed from kwargs, so callers can
+        opt out per request without it reaching agent creation.
+        """
+        use_cache = kwargs.pop("cache", True)
+        if self.response_cache is None or not use_cache:
+            return None
         
-        elif agent_type == "advanced":
-            recursion_limit = kwargs.get("recursion_limit", self.default_recursion_limit)
-            # For CLI with live output, enable verbose. For API, keep it false to capture properly
-            verbose = kwargs.get("verbose", show_live_output)
-            return create_advanced_agent(self.llm, self.tools, verbose=verbose, 
-                                       recursion_limit=recursion_limit)
+        temperature = getattr(self.llm, "temperature", None)
+        if isinstance(temperature, (int, float)) and temperature > MAX_CACHEABLE_TEMPERATURE:
+            return None
+        return self.response_cache
+    
+    def _cache_scope(self, agent_type: str, kwargs: Dict[str, Any]) -> str:
+        """Return the response cache scope for answers of an agent type with the given parameters"""
+        if agent_type == "advanced":
+            return f"{agent_type}:{kwargs.get('recursion_limit', self.default_recursion_limit)}"
+        return agent_type
+    
+    def _create_agent(self, agent_type: str, show_live_output: bool = False, **kwargs):
+        """
+        Return an agent based on type and parameters
         
-        else:
+        The LLM and tools are fixed for the service, so an agent built once for a
+        given type, verbosity and recursion limit serves all later queries.
+        """
+        factory = self._agent_factories.get(agent_type)
+        if factory is None:
             raise ValueError(f"Unknown agent type: {agent_type}. Available: {list(self.agent_types.keys())}")
+        
+        # For CLI with live output, enable verbose. For API, keep it false to capture properly
+        verbose = kwargs.get("verbose", show_live_output)
+        recursion_limit = kwargs.get("recursion_limit", self.default_recursion_limit)
+        key = (agent_type, verbose, recursion_limit if agent_type == "advanced" else None)
+        
+        with self._agents_lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                agent = factory(verbose, recursion_limit)
+                self._agents[key] = agent
+        return agent
+    
+    def _new_standard_agent(self, verbose: bool, recursion_limit: int):
+        """Build a standard agent; it has no recursion limit"""
+        return create_standard_agent(self.llm, self.tools, verbose=verbose)
+    
+    def _new_advanced_agent(self, verbose: bool, recursion_limit: int):
+        """Build an advanced research agent"""
+        return create_advanced_agent(self.llm, self.tools, verbose=verbose,
+                                     recursion_limit=recursion_limit, routing_llm=self.routing_llm)
+    
+    def invalidate_agents(self):
+        """Drop reused agents, e.g. after the LLM or tools of the service were replaced"""
+        with self._agents_lock:
+            self._agents.clear()
     
     def _execute_agent(self, agent, agent_type: str, query: str, thread_id: str = None) -> str:
         """Execute agent with the standard process method"""
@@ -165,25 +405,48 @@ class AgentService:
             agent_type: Type of agent to use (default: advanced)
             thread_id: Thread ID for session management
             show_live_output: Whether to show live output during processing (for CLI)
-            **kwargs: Additional parameters for agent creation
+            **kwargs: Additional parameters for agent creation; cache=False bypasses the response cache
             
         Returns:
             Dict with 'answer', 'logs', 'metadata'
         """
         
         start_time = time.time()
+        response_cache = self._cache_for(kwargs)
+        cache_scope = self._cache_scope(agent_type, kwargs)
         
         # Generate thread ID if not provided
         if not thread_id:
-            thread_id = f"session_{int(time.time())}"
+            thread_id = _new_thread_id()
         
         # Log request
-        self.file_logger.info(f"Processing query - Agent: {agent_type}, Thread: {thread_id}, Query: {query[:100]}...")
+        self.file_logger.info("Processing query - Agent: %s, Thread: %s, Query: %s", agent_type, thread_id, _shorten(query))
         
         # Capture logs during execution with live output option
         log_capture = LogCapture(show_live=show_live_output)
         
         try:
+            # Serve repeated queries from cache without running an agent
+            if response_cache is not None:
+                cached_answer = response_cache.get(query, cache_scope)
+                if cached_answer is not None:
+                    execution_time = time.time() - start_time
+                    self.file_logger.info("Query served from cache - Thread: %s, Time: %.2fs", thread_id, execution_time)
+                    return {
+                        "answer": cached_answer,
+                        "logs": [f"{_timestamp()}: Answer served from response cache"],
+                        "metadata": {
+                            "agent_type": agent_type,
+                            "agent_name": self.agent_types.get(agent_type, agent_type),
+                            "thread_id": thread_id,
+                            "execution_time": round(execution_time, 2),
+                            "timestamp": _timestamp(),
+                            "query_length": len(query),
+                            "tools_available": list(self._tool_names),
+                            "cache_hit": True
+                        }
+                    }
+            
             with log_capture:
                 # Create agent
                 log_capture.add_log(f"Creating {agent_type} agent...")
@@ -208,14 +471,20 @@ class AgentService:
                     "agent_name": self.agent_types.get(agent_type, agent_type),
                     "thread_id": thread_id,
                     "execution_time": round(execution_time, 2),
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _timestamp(),
                     "query_length": len(query),
-                    "tools_available": [tool.name for tool in self.tools]
+                    "tools_available": list(self._tool_names)
                 }
             }
             
+            # Errors and draft answers are returned to the caller but never reused
+            if isinstance(answer, IncompleteAnswer):
+                response["metadata"]["status"] = "incomplete"
+            elif response_cache is not None:
+                response_cache.put(query, answer, cache_scope)
+            
             # Log successful completion
-            self.file_logger.info(f"Query completed - Thread: {thread_id}, Time: {execution_time:.2f}s, Agent: {agent_type}")
+            self.file_logger.info("Query completed - Thread: %s, Time: %.2fs, Agent: %s", thread_id, execution_time, agent_type)
             
             return response
             
@@ -224,7 +493,7 @@ class AgentService:
             error_msg = str(e)
             
             # Log error
-            self.file_logger.error(f"Query failed - Thread: {thread_id}, Time: {execution_time:.2f}s, Error: {error_msg}")
+            self.file_logger.error("Query failed - Thread: %s, Time: %.2fs, Error: %s", thread_id, execution_time, error_msg)
             
             # Add error to logs
             log_capture.add_log(f"ERROR: {error_msg}")
@@ -238,12 +507,99 @@ class AgentService:
                     "agent_name": self.agent_types.get(agent_type, agent_type),
                     "thread_id": thread_id,
                     "execution_time": round(execution_time, 2),
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _timestamp(),
                     "error": error_msg,
                     "status": "error"
                 }
             }
     
+    def stream_query(self, query: str, agent_type: str = "advanced",
+                     thread_id: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """
+        Process query and yield the answer in chunks as it is generated
+        
+        Output is not captured into logs; use process_query when execution
+        logs and metadata are needed.
+        
+        Args:
+            query: User query
+            agent_type: Type of agent to use (default: advanced)
+            thread_id: Thread ID for session management
+            **kwargs: Additional parameters for agent creation; cache=False bypasses the response cache
+            
+        Yields:
+            Consecutive fragments of the answer
+        """
+        start_time = time.time()
+        response_cache = self._cache_for(kwargs)
+        cache_scope = self._cache_scope(agent_type, kwargs)
+        
+        if not thread_id:
+            thread_id = _new_thread_id()
+        
+        self.file_logger.info("Streaming query - Agent: %s, Thread: %s, Query: %s", agent_type, thread_id, _shorten(query))
+        
+        if response_cache is not None:
+            cached_answer = response_cache.get(query, cache_scope)
+            if cached_answer is not None:
+                self.file_logger.info("Query served from cache - Thread: %s", thread_id)
+                yield cached_answer
+                return
+        
+        chunks = []
+        complete = True
+        try:
+            agent = self._create_agent(agent_type, **kwargs)
+            for chunk in agent.process_stream(query, thread_id):
+                chunks.append(chunk)
+                complete = complete and not isinstance(chunk, IncompleteAnswer)
+                yield chunk
+        except Exception as e:
+            # The response is already under way, so the error is reported as its last chunk
+            self.file_logger.error("Stream failed - Thread: %s, Error: %s", thread_id, str(e))
+            yield IncompleteAnswer(f"An error occurred while processing your query: {str(e)}")
+            return
+        
+        if response_cache is not None and complete:
+            response_cache.put(query, "".join(chunks), cache_scope)
+        
+        execution_time = time.time() - start_time
+        self.file_logger.info("Stream completed - Thread: %s, Time: %.2fs, Agent: %s", thread_id, execution_time, agent_type)
+    
+    async def aprocess_queries(self, queries: List[str], agent_type: str = "advanced",
+                               thread_prefix: str = "batch", **kwargs) -> List[Dict[str, Any]]:
+        """
+        Process several independent queries concurrently
+        
+        Each query runs in a worker thread, so total time is bounded by the
+        slowest query rather than the sum of all of them.
+        
+        Args:
+            queries: User queries
+            agent_type: Type of agent to use (default: advanced)
+            thread_prefix: Prefix for generated per-query thread IDs
+            **kwargs: Additional parameters passed to process_query
+            
+        Returns:
+            List of responses in the same order as queries
+        """
+        # kwargs are passed on unchanged, each query checks the cache again
+        response_cache = self._cache_for(dict(kwargs))
+        if response_cache is not None:
+            # Embed all uncached queries in one batch before fanning out
+            response_cache.get_many(queries, self._cache_scope(agent_type, kwargs))
+        
+        tasks = [
+            asyncio.to_thread(self.process_query, query, agent_type,
+                              thread_id=f"{thread_prefix}_{i}", **kwargs)
+            for i, query in enumerate(queries, 1)
+        ]
+        return await asyncio.gather(*tasks)
+    
+    def process_queries(self, queries: List[str], agent_type: str = "advanced", **kwargs) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around aprocess_queries"""
+        return asyncio.run(self.aprocess_queries(queries, agent_type, **kwargs))
+    
     def get_agent_info(self, agent_type: str) -> Dict[str, Any]:
         """Get information about specific agent type"""
         
@@ -261,36 +617,12 @@ class AgentService:
     
     def _get_agent_description(self, agent_type: str) -> str:
         """Get description for agent type"""
-        descriptions = {
-            "standard": "Standard LangChain AgentExecutor with OpenAI function calling and direct tool usage",
-            "advanced": "Advanced research agent with multi-step workflow including planning, reflection, and synthesis"
-        }
-        return descriptions.get(agent_type, "No description available")
+        return AGENT_DESCRIPTIONS.get(agent_type, "No description available")
     
     def _get_agent_parameters(self, agent_type: str) -> Dict[str, Any]:
         """Get available parameters for agent type"""
-        
-        if agent_type == "advanced":
-            return {
-                "recursion_limit": {
-                    "type": "integer",
-                    "default": self.default_recursion_limit,
-                    "description": "Maximum number of steps in workflow"
-                },
-                "verbose": {
-                    "type": "boolean", 
-                    "default": False,
-                    "description": "Enable verbose output"
-                }
-            }
-        
-        elif agent_type == "standard":
-            return {
-                "verbose": {
-                    "type": "boolean",
-                    "default": False,
-                    "description": "Enable verbose output"
-                }
-            }
-        
-        return {} 
\ No newline at end of file
+        # Each specification is a flat dict of immutable values, so a shallow copy fully detaches it
+        parameters = {name: dict(spec) for name, spec in AGENT_PARAMETERS.get(agent_type, {}).items()}
+        if "recursion_limit" in parameters:
+            parameters["recursion_limit"]["default"] = self.default_recursion_limit
+        return parameters
@@ -0,0 +1,109 @@
+"""
+Async Utilities - helpers for driving async agent code from synchronous callers
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the shared background event loop, starting it on first use.
+
+    A single long-lived loop is used instead of asyncio.run() per call because
+    async HTTP clients held by LLM instances keep connections bound to the loop
+    that opened them.
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="async-utils-loop", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+def _submit(awaitable: Awaitable[T]) -> concurrent.futures.Future:
+    """Schedule an awaitable on the background loop within the caller's context"""
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("Cannot block on the background event loop from within it")
+
+    loop = _get_loop()
+    # Tasks copy the current context when created, so creating the task inside the
+    # caller's context makes context variables (e.g. log capture) apply to it
+    context = contextvars.copy_context()
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def on_done(task: asyncio.Task):
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def start():
+        task = context.run(loop.create_task, awaitable)
+        task.add_done_callback(on_done)
+
+    loop.call_soon_threadsafe(start)
+    return future
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Works whether or not the caller is already inside a running event loop.
+
+    Args:
+        awaitable: Coroutine to run
+
+    Returns:
+        Result of the coroutine
+    """
+    return _submit(awaitable).result()
+
+
+def iterate_sync(async_iterator: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Consume an async iterator from synchronous code.
+
+    The iterator runs on the shared background event loop, so this works
+    whether or not the caller is already inside a running event loop.
+    Items are handed over through a queue as soon as they are produced.
+
+    Args:
+        async_iterator: Async iterator to consume
+
+    Yields:
+        Items produced by the async iterator
+    """
+    items: queue.Queue = queue.Queue()
+
+    async def drain():
+        async for item in async_iterator:
+            items.put(item)
+
+    future = _submit(drain())
+    future.add_done_callback(lambda _: items.put(_DONE))
+
+    while True:
+        item = items.get()
+        if item is _DONE:
+            # Re-raises any error from the iterator
+            future.result()
+            return
+        yield item
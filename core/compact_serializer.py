@@ -0,0 +1,58 @@
+"""
+Compact Serializer - module responsible for shrinking payloads sent to the LLM
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is used otherwise
+    orjson = None
+
+
+def to_compact(value: Any) -> Any:
+    """
+    Recursively drop None and empty values from a JSON-like structure.
+
+    Tool schemas are sent with every request, so null and empty fields cost
+    prompt tokens without telling the model anything. False and 0 are kept.
+
+    Args:
+        value: Dictionary, list or scalar to compact
+
+    Returns:
+        Compacted copy of the value
+    """
+    if isinstance(value, dict):
+        compacted = {key: to_compact(item) for key, item in value.items()}
+        return {key: item for key, item in compacted.items() if not _is_empty(item)}
+    if isinstance(value, list):
+        compacted = [to_compact(item) for item in value]
+        return [item for item in compacted if not _is_empty(item)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    """Check whether a value is None or an empty string/list/dict (False and 0 are not empty)"""
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def dumps(value: Any) -> str:
+    """
+    Serialize a value to a compact JSON string.
+
+    Uses orjson when installed, falling back to the standard library.
+    Non-ASCII text is kept as is and unknown objects are converted with str().
+
+    Args:
+        value: JSON-like value to serialize
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -2,9 +2,18 @@
 Config Loader - module responsible for loading configuration from YAML file
 """
 
+import copy
 import os
+import threading
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+# libyaml's C loader parses several times faster; fall back to the pure-Python one without it
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed configurations keyed by (absolute path, modification time, size), so edits are picked up
+_config_cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+_config_cache_lock = threading.Lock()
 
 class ConfigLoader:
     """Class for loading and validating configuration from YAML file."""
@@ -26,13 +35,27 @@ class ConfigLoader:
         """
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file {config_path} does not exist")
-            
-        with open(config_path, 'r', encoding='utf-8') as file:
-            try:
-                config = yaml.safe_load(file)
-                return config
-            except yaml.YAMLError as e:
-                raise yaml.YAMLError(f"Error parsing YAML file: {e}")
+        
+        stat = os.stat(config_path)
+        key = (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+        with _config_cache_lock:
+            config = _config_cache.get(key)
+        
+        if config is None:
+            # Bytes go straight to the parser, which decodes UTF-8 itself
+            with open(config_path, 'rb') as file:
+                try:
+                    config = yaml.load(file, Loader=_SafeLoader)
+                except yaml.YAMLError as e:
+                    raise yaml.YAMLError(f"Error parsing YAML file: {e}")
+            with _config_cache_lock:
+                # Older versions of this file will not be requested again
+                for stale in [cached for cached in _config_cache if cached[0] == key[0]]:
+                    del _config_cache[stale]
+                _config_cache[key] = config
+        
+        # Callers may modify their configuration (e.g. tool settings), so each gets its own copy
+        return copy.deepcopy(config)
     
     @staticmethod
     def get_llm_config(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,104 @@
+"""
+LLM Cache - module responsible for answering identical LLM requests from memory
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+DEFAULT_MAX_SIZE = 1000
+
+# Responses sampled above this temperature vary between calls, so they are not cached
+MAX_CACHEABLE_TEMPERATURE = 0.1
+
+# Temperature in the serialized model configuration ("temperature": 0.5)
+# or in the call parameters appended to it (('temperature', 0.5))
+_TEMPERATURE = re.compile(r"""["']temperature["']\)?\s*[:,]\s*([0-9.]+)""")
+
+
+def _temperature(llm_string: str) -> Optional[float]:
+    """Extract the effective sampling temperature from an llm_string, if present"""
+    matches = _TEMPERATURE.findall(llm_string)
+    # Call parameters follow the model configuration, so the last value wins
+    return float(matches[-1]) if matches else None
+
+
+class LLMCache(BaseCache):
+    """
+    In-memory LangChain cache with LRU eviction and optional expiry.
+
+    Entries are keyed by sha256 of the prompt and the llm_string, which LangChain
+    builds from the model, its parameters and bound tools, so only requests that
+    are identical in every respect share a response.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = None,
+                 max_temperature: float = MAX_CACHEABLE_TEMPERATURE):
+        """
+        Initialize LLM cache.
+
+        Args:
+            maxsize: Maximum number of stored responses; least recently used are dropped first
+            ttl: Seconds after which a stored response expires (never if None)
+            max_temperature: Requests sampled above this temperature, or without an explicit one,
+                             are neither cached nor looked up
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._entries: "OrderedDict[str, Tuple[float, RETURN_VAL_TYPE]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def _cacheable(self, llm_string: str) -> bool:
+        temperature = _temperature(llm_string)
+        # Without an explicit temperature the provider default applies, which usually samples
+        return temperature is not None and temperature <= self.max_temperature
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        # LangChain skips caches that are falsy, which an empty sized object would be
+        return True
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return the stored response for an identical request, or None"""
+        if not self._cacheable(llm_string):
+            return None
+
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the response to a request"""
+        if not self._cacheable(llm_string):
+            return
+
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._entries[key] = (time.time(), return_val)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all stored responses"""
+        with self._lock:
+            self._entries.clear()
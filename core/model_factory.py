@@ -3,10 +3,87 @@ Model Factory - module responsible for creating LLM model instances
 based on configuration from YAML file.
 """
 
+import importlib
+import json
 import os
-from typing import Dict, Any, Optional
-from langchain_openai import ChatOpenAI, AzureChatOpenAI
-from langchain_anthropic import ChatAnthropic
+import threading
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - optional, enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool shared by all models created here; sized for the parallel
+# requests of the research agent plus concurrent HTTP API queries
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+
+@lru_cache(maxsize=None)
+def _http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Return the process-wide sync and async HTTP clients used for LLM API calls.
+    
+    Keeping connections alive across models and queries saves a TCP and TLS handshake
+    per request. HTTP/2 is used when the optional h2 package is installed.
+    """
+    return (
+        httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS),
+        httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS)
+    )
+
+
+class _Provider(NamedTuple):
+    """How to build the chat model of one LLM provider"""
+    # "module:Class", imported on first use so only the configured provider's SDK is loaded
+    model_class: str
+    label: str
+    api_key_vars: Tuple[str, ...]
+    default_model: str
+    optional_keys: Tuple[str, ...]
+    shared_http_clients: bool
+
+
+_PROVIDERS: Dict[str, _Provider] = {
+    "openai": _Provider(
+        "langchain_openai:ChatOpenAI", "OpenAI", ("OPENAI_API_KEY",), "gpt-4o",
+        ("base_url", "api_version", "timeout", "max_retries"), True
+    ),
+    # ChatAnthropic takes no custom HTTP client; it already reuses a cached
+    # keep-alive client per endpoint and timeout
+    "anthropic": _Provider(
+        "langchain_anthropic:ChatAnthropic", "Anthropic", ("ANTHROPIC_API_KEY",), "claude-3-5-sonnet-20240620",
+        ("base_url", "timeout", "max_retries"), False
+    ),
+    "azure_openai": _Provider(
+        "langchain_openai:AzureChatOpenAI", "Azure OpenAI", ("AZURE_OPENAI_API_KEY", "OPENAI_API_KEY"), "gpt-4o",
+        ("azure_endpoint", "deployment_name", "api_version", "timeout", "max_retries"), True
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _import_class(path: str) -> type:
+    """Import a class given as module:Class"""
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# Models already created, keyed by provider and the settings of its model section
+_llm_cache: Dict[str, Any] = {}
+_llm_cache_lock = threading.Lock()
+
+
+def _llm_signature(config: Dict[str, Any]) -> str:
+    """Build a canonical key from the parts of an LLM configuration that shape the model"""
+    provider = config.get("provider", "openai").lower()
+    model_config = config.get("models", {}).get(provider, {})
+    return json.dumps({"provider": provider, "model": model_config}, sort_keys=True, default=str)
+
 
 class ModelFactory:
     """LLM model factory supporting multiple providers."""
@@ -16,6 +93,9 @@ class ModelFactory:
         """
         Create an LLM model instance based on configuration.
         
+        Identical configurations share one model instance, so provider clients
+        are set up only once per process.
+        
         Args:
             config: Dictionary with LLM configuration from YAML file
             
@@ -25,101 +105,50 @@ class ModelFactory:
         Raises:
             ValueError: If the provider is not supported
         """
-        provider = config.get("provider", "openai").lower()
+        signature = _llm_signature(config)
+        with _llm_cache_lock:
+            llm = _llm_cache.get(signature)
+            if llm is None:
+                llm = ModelFactory._build_llm(config)
+                _llm_cache[signature] = llm
+        return llm
+    
+    @staticmethod
+    def clear_cache():
+        """Forget created models, so the next create_llm call builds new ones"""
+        with _llm_cache_lock:
+            _llm_cache.clear()
+    
+    @staticmethod
+    def _build_llm(config: Dict[str, Any]):
+        """Construct a new LLM model instance for the configured provider"""
+        provider_name = config.get("provider", "openai").lower()
+        provider = _PROVIDERS.get(provider_name)
+        if provider is None:
+            raise ValueError(f"Unsupported LLM provider: {provider_name}. "
+                           f"Supported providers are: {', '.join(_PROVIDERS)}")
         
-        if provider == "openai":
-            model_config = config.get("models", {}).get("openai", {})
-            
-            # Check if OpenAI API key is available
-            if not os.environ.get("OPENAI_API_KEY"):
-                raise ValueError(
-                    "Missing OpenAI API key. "
-                    "Make sure OPENAI_API_KEY is set in .env file"
-                )
-            
-            # Basic parameters
-            model_name = model_config.get("name", "gpt-4o")
-            temperature = model_config.get("temperature", 0.5)
-            
-            # Optional parameters
-            kwargs = {}
-            if model_config.get("base_url"):
-                kwargs["base_url"] = model_config["base_url"]
-            if model_config.get("api_version"):
-                kwargs["api_version"] = model_config["api_version"]
-            if model_config.get("timeout"):
-                kwargs["timeout"] = model_config["timeout"]
-            if model_config.get("max_retries") is not None:
-                kwargs["max_retries"] = model_config["max_retries"]
-            
-            return ChatOpenAI(
-                model=model_name,
-                temperature=temperature,
-                **kwargs
-            )
-            
-        elif provider == "azure_openai":
-            model_config = config.get("models", {}).get("azure_openai", {})
-            
-            # Check required environment variables for Azure
-            if not os.environ.get("AZURE_OPENAI_API_KEY") and not os.environ.get("OPENAI_API_KEY"):
-                raise ValueError(
-                    "Missing Azure OpenAI API key. "
-                    "Make sure AZURE_OPENAI_API_KEY or OPENAI_API_KEY is set in .env file"
-                )
-            
-            # Basic parameters
-            model_name = model_config.get("name", "gpt-4o")
-            temperature = model_config.get("temperature", 0.5)
-            
-            # Azure-specific parameters
-            kwargs = {}
-            if model_config.get("azure_endpoint"):
-                kwargs["azure_endpoint"] = model_config["azure_endpoint"]
-            if model_config.get("deployment_name"):
-                kwargs["deployment_name"] = model_config["deployment_name"]
-            if model_config.get("api_version"):
-                kwargs["api_version"] = model_config["api_version"]
-            if model_config.get("timeout"):
-                kwargs["timeout"] = model_config["timeout"]
-            if model_config.get("max_retries") is not None:
-                kwargs["max_retries"] = model_config["max_retries"]
-            
-            return AzureChatOpenAI(
-                model=model_name,
-                temperature=temperature,
-                **kwargs
-            )
-            
-        elif provider == "anthropic":
-            model_config = config.get("models", {}).get("anthropic", {})
-            
-            # Check if Anthropic API key is available
-            if not os.environ.get("ANTHROPIC_API_KEY"):
-                raise ValueError(
-                    "Missing Anthropic API key. "
-                    "Make sure ANTHROPIC_API_KEY is set in .env file"
-                )
-            
-            # Basic parameters
-            model_name = model_config.get("name", "claude-3-5-sonnet-20240620")
-            temperature = model_config.get("temperature", 0.5)
-            
-            # Optional parameters
-            kwargs = {}
-            if model_config.get("base_url"):
-                kwargs["base_url"] = model_config["base_url"]
-            if model_config.get("timeout"):
-                kwargs["timeout"] = model_config["timeout"]
-            if model_config.get("max_retries") is not None:
-                kwargs["max_retries"] = model_config["max_retries"]
-            
-            return ChatAnthropic(
-                model=model_name,
-                temperature=temperature,
-                **kwargs
+        model_config = config.get("models", {}).get(provider_name, {})
+        
+        # Check if the API key is available
+        if not any(os.environ.get(name) for name in provider.api_key_vars):
+            raise ValueError(
+                f"Missing {provider.label} API key. "
+                f"Make sure {' or '.join(provider.api_key_vars)} is set in .env file"
             )
-            
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}. "
-                           "Supported providers are: openai, anthropic, azure_openai") 
\ No newline at end of file
+        
+        # Optional parameters; max_retries may legitimately be 0
+        kwargs = {}
+        for key in provider.optional_keys:
+            value = model_config.get(key)
+            if value or (key == "max_retries" and value is not None):
+                kwargs[key] = value
+        if provider.shared_http_clients:
+            kwargs["http_client"], kwargs["http_async_client"] = _http_clients()
+        
+        model_class = _import_class(provider.model_class)
+        return model_class(
+            model=model_config.get("name", provider.default_model),
+            temperature=model_config.get("temperature", 0.5),
+            **kwargs
+        )
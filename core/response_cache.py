@@ -0,0 +1,226 @@
+"""
+Response Cache - module responsible for persisting final answers on disk
+so repeated queries are answered without running an agent
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .semantic_cache import SemanticCache
+
+# Embeddings of missed queries kept for the following put(); queries that are never
+# stored (errors, cache=False) would otherwise accumulate, so only the newest are kept
+MAX_PENDING_EMBEDDINGS = 256
+
+
+class ResponseCache:
+    """SQLite-backed answer cache with exact and optional semantic lookup"""
+
+    def __init__(self, db_path: str = "logs/response_cache.sqlite",
+                 semantic_cache: Optional[SemanticCache] = None, ttl: Optional[float] = None):
+        """
+        Initialize response cache and load stored entries.
+
+        Args:
+            db_path: Path to SQLite database file
+            semantic_cache: Optional semantic cache used when there is no exact match
+            ttl: Seconds after which a stored answer is no longer served (never expires if None)
+        """
+        self.db_path = db_path
+        self.semantic_cache = semantic_cache
+        self.ttl = ttl
+        self._answers: Dict[str, str] = {}
+        self._created: Dict[str, float] = {}
+        self._pending_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection for the cache's lifetime instead of a connect/close per write
+        self._conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        # Connection-scoped: with WAL, NORMAL only syncs at checkpoints instead of every commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._db_lock = threading.Lock()
+
+        self._init_db()
+        self._load()
+
+    @staticmethod
+    def hash_query(query: str, scope: str = "") -> str:
+        """Return content hash of the normalized query text within a scope"""
+        text = query.strip().lower()
+        if scope:
+            text = f"{scope}\x00{text}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @contextmanager
+    def _connect(self):
+        """Use the shared database connection, one thread at a time"""
+        with self._db_lock:
+            yield self._conn
+
+    def close(self):
+        """Close the database connection"""
+        with self._db_lock:
+            self._conn.close()
+
+    def _init_db(self):
+        """Create cache table if it does not exist"""
+        with self._connect() as conn:
+            # Persistent: lets readers (e.g. another CLI run) proceed while an answer is written
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache(hash TEXT PRIMARY KEY, embedding BLOB, answer TEXT, created REAL, "
+                "scope TEXT)"
+            )
+            # Databases written before answers expired have no creation time
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cache)")]
+            if "created" not in columns:
+                conn.execute("ALTER TABLE cache ADD COLUMN created REAL")
+            # Answers stored before they were scoped cannot be attributed to an agent, so they are dropped
+            if "scope" not in columns:
+                conn.execute("ALTER TABLE cache ADD COLUMN scope TEXT")
+                conn.execute("DELETE FROM cache")
+            conn.commit()
+
+    def _load(self):
+        """Load all stored entries into memory, dropping expired ones from disk"""
+        with self._connect() as conn:
+            if self.ttl is not None:
+                # One statement and one commit instead of deleting expired rows one by one
+                conn.execute("DELETE FROM cache WHERE created IS NULL OR created < ?",
+                             (time.time() - self.ttl,))
+                conn.commit()
+            rows = conn.execute("SELECT hash, embedding, answer, created, scope FROM cache").fetchall()
+
+        embeddings, answers, created_times, scopes = [], [], [], []
+        for query_hash, embedding, answer, created, scope in rows:
+            # Entries without a creation time count as expired once a TTL is set
+            created = created or 0.0
+            if self._expired(created):
+                continue
+            self._answers[query_hash] = answer
+            self._created[query_hash] = created
+            if embedding:
+                embeddings.append(np.frombuffer(embedding, dtype=np.float16))
+                answers.append(answer)
+                created_times.append(created)
+                scopes.append(scope or "")
+
+        # Build the similarity matrix in one step instead of growing it row by row
+        if self.semantic_cache is not None and answers:
+            self.semantic_cache.add_many(np.vstack(embeddings).astype(np.float32), answers, created_times, scopes)
+
+    def _expired(self, created: float) -> bool:
+        """Check whether an answer stored at the given time is past the TTL"""
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def get(self, query: str, scope: str = "") -> Optional[str]:
+        """
+        Get cached answer for a query.
+
+        Args:
+            query: User query
+            scope: Scope the answer was stored under (e.g. agent type and settings)
+
+        Returns:
+            Cached answer or None if the query was not seen before
+        """
+        query_hash = self.hash_query(query, scope)
+        answer = self._exact(query_hash)
+        if answer is not None or self.semantic_cache is None:
+            return answer
+
+        # Keep the embedding so a following put() does not encode the query again
+        with self._pending_lock:
+            embedding = self._pending_embeddings.get(query_hash)
+        if embedding is None:
+            embedding = self.semantic_cache.embed(query)
+            self._remember_embedding(query_hash, embedding)
+        return self.semantic_cache.search(embedding, max_age=self.ttl, scope=scope)
+
+    def _exact(self, query_hash: str) -> Optional[str]:
+        """Return the unexpired answer stored for a query hash"""
+        answer = self._answers.get(query_hash)
+        if answer is not None and self._expired(self._created[query_hash]):
+            return None
+        return answer
+
+    def _remember_embedding(self, query_hash: str, embedding: np.ndarray):
+        """Keep a missed query's embedding for put(), dropping the oldest beyond MAX_PENDING_EMBEDDINGS"""
+        with self._pending_lock:
+            self._pending_embeddings[query_hash] = embedding
+            self._pending_embeddings.move_to_end(query_hash)
+            while len(self._pending_embeddings) > MAX_PENDING_EMBEDDINGS:
+                self._pending_embeddings.popitem(last=False)
+
+    def get_many(self, queries: Sequence[str], scope: str = "") -> List[Optional[str]]:
+        """
+        Get cached answers for several queries.
+
+        Queries without an exact match are embedded together in one batch.
+
+        Args:
+            queries: User queries
+            scope: Scope the answers were stored under (e.g. agent type and settings)
+
+        Returns:
+            Cached answer or None for each query, in input order
+        """
+        hashes = [self.hash_query(query, scope) for query in queries]
+        results: List[Optional[str]] = [self._exact(query_hash) for query_hash in hashes]
+
+        misses = [i for i, answer in enumerate(results) if answer is None]
+        if self.semantic_cache is None or not misses:
+            return results
+
+        embeddings = self.semantic_cache.embed_batch([queries[i] for i in misses])
+        for i, embedding in zip(misses, embeddings):
+            self._remember_embedding(hashes[i], embedding)
+            results[i] = self.semantic_cache.search(embedding, max_age=self.ttl, scope=scope)
+        return results
+
+    def put(self, query: str, answer: str, scope: str = ""):
+        """
+        Store answer for a query.
+
+        Args:
+            query: User query
+            answer: Final answer produced by the agent
+            scope: Scope the answer is only served under (e.g. agent type and settings)
+        """
+        query_hash = self.hash_query(query, scope)
+        embedding_blob = None
+        created = time.time()
+
+        if self.semantic_cache is not None:
+            with self._pending_lock:
+                embedding = self._pending_embeddings.pop(query_hash, None)
+            if embedding is None:
+                embedding = self.semantic_cache.embed(query)
+            self.semantic_cache.add(embedding, answer, created, scope)
+            # float16 halves storage; precision loss is irrelevant at the similarity threshold
+            embedding_blob = np.asarray(embedding, dtype=np.float16).tobytes()
+
+        # Lookups read the answer first, so its creation time must already be there
+        self._created[query_hash] = created
+        self._answers[query_hash] = answer
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache(hash, embedding, answer, created, scope) VALUES (?, ?, ?, ?, ?)",
+                (query_hash, embedding_blob, answer, created, scope)
+            )
+            conn.commit()
@@ -0,0 +1,93 @@
+"""
+Runtime - module responsible for building the process-wide agent runtime
+(configuration, LLM, tools and agent service) once and sharing it between entry points
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.tools import BaseTool
+
+from .agent_service import AgentService
+from .async_utils import run_sync
+from .config_loader import ConfigLoader
+from .llm_cache import LLMCache
+from .model_factory import ModelFactory
+from .tool_factory import ToolFactory
+
+
+class Runtime:
+    """Initialized application components shared by the CLI and the HTTP server"""
+
+    def __init__(self, config: Dict[str, Any], llm: BaseLanguageModel,
+                 tools: List[BaseTool], agent_service: AgentService):
+        self.config = config
+        self.llm = llm
+        self.tools = tools
+        self.agent_service = agent_service
+
+    @property
+    def recursion_limit(self) -> int:
+        return self.agent_service.default_recursion_limit
+
+    def warmup(self) -> bool:
+        """
+        Send a trivial request to the LLM so the HTTP connection and TLS session
+        are established before the first real query.
+
+        The request is billed, so it is only sent when llm.warmup is enabled. It goes
+        through the async client on the shared event loop, which is the connection
+        pool agents use for their requests.
+
+        Returns:
+            True if the warmup request succeeded, False otherwise
+        """
+        if not self.config.get("llm", {}).get("warmup", False):
+            return False
+        try:
+            run_sync(self.llm.ainvoke("ping", max_tokens=1))
+            return True
+        except Exception as e:
+            logging.warning("LLM warmup failed: %s", e)
+            return False
+
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime(config_path: str = "config.yaml") -> Runtime:
+    """
+    Get the process-wide runtime, creating it on first call.
+
+    Args:
+        config_path: Path to configuration file (used only on first call)
+
+    Returns:
+        Shared Runtime instance
+    """
+    global _runtime
+    if _runtime is not None:
+        return _runtime
+
+    with _runtime_lock:
+        if _runtime is None:
+            load_dotenv()
+            config = ConfigLoader.load_config(config_path)
+            # Identical deterministic LLM requests (same model, parameters, tools and prompt) are
+            # answered from memory. An application-wide cache configured elsewhere takes precedence.
+            if config["llm"].get("cache", True) and get_llm_cache() is None:
+                set_llm_cache(LLMCache())
+            llm = ModelFactory.create_llm(config["llm"])
+            tools = ToolFactory().create_tools(config["tools"], llm)
+            # Optional smaller model for the research agent's routing steps
+            routing_config = config["llm"].get("routing")
+            routing_llm = ModelFactory.create_llm(routing_config) if routing_config else None
+            recursion_limit = config.get("graph", {}).get("recursion_limit", 50)
+            agent_service = AgentService(llm, tools, recursion_limit, routing_llm=routing_llm)
+            _runtime = Runtime(config, llm, tools, agent_service)
+    return _runtime
@@ -0,0 +1,130 @@
+"""
+Semantic Cache - module responsible for reusing answers to semantically
+equivalent queries based on embedding similarity
+"""
+
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class SemanticCache:
+    """In-memory cache of answers keyed by normalized query embeddings"""
+
+    def __init__(self, encoder: Any = None, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize semantic cache.
+
+        Args:
+            encoder: Object exposing SentenceTransformer-like encode(); loaded lazily if None
+            model_name: Embedding model used when no encoder is provided
+            threshold: Minimum cosine similarity treated as a cache hit
+            max_entries: Maximum number of stored answers; the oldest are dropped first
+        """
+        self._encoder = encoder
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.E: Optional[np.ndarray] = None
+        self.answers: List[str] = []
+        self.created: List[float] = []
+        # Answers are only reused within the scope they were stored under (e.g. the agent that produced them)
+        self.scopes: List[str] = []
+        # E, answers and created change in several steps; searches must not see them half-updated
+        self._lock = threading.Lock()
+
+    @property
+    def encoder(self) -> Any:
+        """Return the embedding model, loading it on first use"""
+        if self._encoder is None:
+            # Heavy optional dependency - imported only when the cache is actually used
+            from sentence_transformers import SentenceTransformer
+            self._encoder = SentenceTransformer(self.model_name)
+        return self._encoder
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def embed(self, query: str) -> np.ndarray:
+        """Compute normalized embedding for a query"""
+        embedding = self.encoder.encode(query, normalize_embeddings=True)
+        return np.asarray(embedding, dtype=np.float32)
+
+    def embed_batch(self, queries: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Compute normalized embeddings for several queries in a single encode call"""
+        embeddings = self.encoder.encode(list(queries), normalize_embeddings=True, batch_size=batch_size)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(queries), -1)
+
+    def search(self, embedding: np.ndarray, max_age: Optional[float] = None, scope: str = "") -> Optional[str]:
+        """
+        Find cached answer for an embedding.
+
+        Args:
+            embedding: Normalized query embedding
+            max_age: Ignore answers stored more than this many seconds ago
+            scope: Only consider answers stored under this scope
+
+        Returns:
+            Cached answer if the best match exceeds the threshold, otherwise None
+        """
+        with self._lock:
+            if self.E is None:
+                return None
+
+            # Rows of E are normalized, so a single matrix-vector product yields cosine similarities
+            sims = self.E @ embedding
+            eligible = np.asarray(self.scopes) == scope
+            if max_age is not None:
+                eligible &= np.asarray(self.created) >= time.time() - max_age
+            sims = np.where(eligible, sims, -np.inf)
+            best = int(np.argmax(sims))
+            if sims[best] > self.threshold:
+                return self.answers[best]
+            return None
+
+    def add(self, embedding: np.ndarray, answer: str, created: Optional[float] = None, scope: str = ""):
+        """Store answer under the given embedding and scope, created now unless a timestamp is given"""
+        row = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        with self._lock:
+            self.E = row if self.E is None else np.vstack([self.E, row])
+            self.answers.append(answer)
+            self.created.append(time.time() if created is None else created)
+            self.scopes.append(scope)
+            self._evict()
+
+    def add_many(self, embeddings: np.ndarray, answers: Sequence[str], created: Optional[Sequence[float]] = None,
+                 scopes: Optional[Sequence[str]] = None):
+        """Store several answers at once, growing the matrix a single time"""
+        if not len(answers):
+            return
+        rows = np.asarray(embeddings, dtype=np.float32).reshape(len(answers), -1)
+        with self._lock:
+            self.E = rows if self.E is None else np.vstack([self.E, rows])
+            self.answers.extend(answers)
+            self.created.extend([time.time()] * len(answers) if created is None else created)
+            self.scopes.extend([""] * len(answers) if scopes is None else scopes)
+            self._evict()
+
+    def _evict(self):
+        """Drop the oldest entries beyond max_entries, keeping the scan cost bounded (caller holds the lock)"""
+        excess = len(self.answers) - self.max_entries
+        if excess > 0:
+            self.E = self.E[excess:]
+            del self.answers[:excess]
+            del self.created[:excess]
+            del self.scopes[:excess]
+
+    def get(self, query: str) -> Optional[str]:
+        """Get cached answer for a query"""
+        return self.search(self.embed(query))
+
+    def put(self, query: str, answer: str):
+        """Cache answer for a query"""
+        self.add(self.embed(query), answer)
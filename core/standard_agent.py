@@ -3,13 +3,39 @@ Standard LangChain Agent using AgentExecutor
 Demonstrates basic LangChain functionality with tools and function calling
 """
 
-from typing import List
+from typing import Iterator, List
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.tools import BaseTool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.agents import create_openai_functions_agent, AgentExecutor
+from langchain.agents import create_openai_functions_agent
 
-from .agent_interface import AgentInterface
+from .agent_interface import AgentInterface, IncompleteAnswer
+from .agent_executor import DedupAgentExecutor
+from .async_utils import iterate_sync
+
+
+# Prompt shared by all standard agents; built once since templates are immutable
+STANDARD_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a helpful AI assistant with access to various tools.
+            
+When answering questions:
+1. Use the available tools when you need current information or specific calculations
+2. For research questions, use DuckDuckGo search to get up-to-date information
+3. For mathematical calculations, use the Math tool
+4. For time-related queries, use the DateTime tool
+5. For general knowledge questions, you can answer directly if confident
+
+Always provide clear, well-structured responses based on the information you gather."""),
+    
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+
+def _calls_tool(message) -> bool:
+    """Check whether a (chunk of a) model message requests a tool call"""
+    return bool(message.additional_kwargs.get("function_call") or getattr(message, "tool_call_chunks", None)
+                or getattr(message, "tool_calls", None))
 
 
 class StandardAgent(AgentInterface):
@@ -24,28 +50,11 @@ class StandardAgent(AgentInterface):
     def _setup_agent(self):
         """Setup the standard LangChain agent with function calling"""
         
-        # Create a prompt template for the agent
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a helpful AI assistant with access to various tools.
-            
-When answering questions:
-1. Use the available tools when you need current information or specific calculations
-2. For research questions, use DuckDuckGo search to get up-to-date information
-3. For mathematical calculations, use the Math tool
-4. For time-related queries, use the DateTime tool
-5. For general knowledge questions, you can answer directly if confident
-
-Always provide clear, well-structured responses based on the information you gather."""),
-            
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-        
         # Create the OpenAI functions agent
-        agent = create_openai_functions_agent(self.llm, self.tools, prompt)
+        agent = create_openai_functions_agent(self.llm, self.tools, STANDARD_PROMPT)
         
-        # Create the agent executor
-        self.agent_executor = AgentExecutor(
+        # Create the agent executor (identical tool calls within a query run only once)
+        self.agent_executor = DedupAgentExecutor(
             agent=agent,
             tools=self.tools,
             verbose=self.verbose,
@@ -76,11 +85,42 @@ Always provide clear, well-structured responses based on the information you gat
             return output
             
         except Exception as e:
-            error_msg = f"Error processing query: {str(e)}"
+            error_msg = IncompleteAnswer(f"Error processing query: {str(e)}")
             if self.verbose:
                 print(f"❌ {error_msg}")
             return error_msg
     
+    def process_stream(self, query: str, thread_id: str = "default") -> Iterator[str]:
+        """
+        Process query and yield answer tokens as the LLM produces them
+        
+        Text of model turns that call a tool is not part of the answer. It is dropped
+        once the turn is known to call a tool; text streamed before that point is
+        followed by an IncompleteAnswer separator, so the joined stream is not cached.
+        """
+        
+        async def stream_tokens():
+            tool_turns = set()
+            streamed_turns = set()
+            async for event in self.agent_executor.astream_events({"input": query}, version="v2"):
+                run_id = event["run_id"]
+                if event["event"] == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"]
+                    if _calls_tool(chunk):
+                        tool_turns.add(run_id)
+                    elif chunk.content and run_id not in tool_turns:
+                        streamed_turns.add(run_id)
+                        yield chunk.content
+                elif event["event"] == "on_chat_model_end" and run_id in streamed_turns:
+                    output = event["data"].get("output")
+                    if run_id in tool_turns or (output is not None and _calls_tool(output)):
+                        yield IncompleteAnswer("\n\n")
+        
+        try:
+            yield from iterate_sync(stream_tokens())
+        except Exception as e:
+            yield IncompleteAnswer(f"Error processing query: {str(e)}")
+    
     @property
     def name(self) -> str:
         """Return the display name of this agent"""
@@ -3,11 +3,18 @@ Tool Factory - a module responsible for creating tools for the agent
 based on configuration from a YAML file.
 """
 
-from typing import Dict, Any, List
+import json
+import threading
+from typing import Dict, Any, List, Tuple
 from langchain_core.tools import BaseTool
 from langchain_core.language_models import BaseLanguageModel
 from tools import TOOL_REGISTRY
 
+# Tools already created, keyed by the tool configuration and the LLM they use
+_tools_cache: Dict[Tuple[str, int], List[BaseTool]] = {}
+_tools_cache_lock = threading.Lock()
+
+
 class ToolFactory:
     """Tool factory for the agent supporting various tool types."""
     
@@ -16,6 +23,9 @@ class ToolFactory:
         """
         Create a list of tools based on configuration.
         
+        Identical configurations used with the same LLM share one set of tool
+        instances, so tools are constructed only once per process.
+        
         Args:
             config: List of dictionaries with tool configuration from YAML file
             llm: LLM model instance to be used by tools (e.g. for calculator)
@@ -23,6 +33,23 @@ class ToolFactory:
         Returns:
             List of tools for the agent
         """
+        signature = (json.dumps(config, sort_keys=True, default=str), id(llm))
+        with _tools_cache_lock:
+            tools = _tools_cache.get(signature)
+            if tools is None:
+                tools = ToolFactory._build_tools(config, llm)
+                _tools_cache[signature] = tools
+        return list(tools)
+    
+    @staticmethod
+    def clear_cache():
+        """Forget created tools, so the next create_tools call builds new ones"""
+        with _tools_cache_lock:
+            _tools_cache.clear()
+    
+    @staticmethod
+    def _build_tools(config: List[Dict[str, Any]], llm: BaseLanguageModel) -> List[BaseTool]:
+        """Construct new tool instances for the enabled tools in the configuration"""
         tools = []
         
         for tool_config in config:
@@ -31,9 +58,9 @@ class ToolFactory:
                 
             tool_type = tool_config.get("type", "").lower()
             
-            # Add LLM reference if required by the tool
+            # Add LLM reference if required by the tool, without altering the caller's configuration
             if tool_type == "math":
-                tool_config["llm"] = llm
+                tool_config = {**tool_config, "llm": llm}
             
             # Get tool class from a registry
             tool_class = TOOL_REGISTRY.get(tool_type)
@@ -6,17 +6,16 @@ FastAPI server providing REST endpoints for agent interactions
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
-from dotenv import load_dotenv
+import asyncio
 import logging
 import time
 from datetime import datetime
 
-from core.config_loader import ConfigLoader
-from core.model_factory import ModelFactory
-from core.tool_factory import ToolFactory
 from core.agent_service import AgentService
+from core.runtime import get_runtime
 
 
 # Pydantic models for API
@@ -84,32 +83,21 @@ async def startup_event():
     global agent_service
     
     try:
-        # Load environment variables
-        load_dotenv()
+        # Load configuration, LLM, tools and agent service
+        runtime = await asyncio.to_thread(get_runtime)
+        agent_service = runtime.agent_service
+        tools = runtime.tools
+        recursion_limit = runtime.recursion_limit
         
-        # Load configuration
-        config_loader = ConfigLoader()
-        config = config_loader.load_config()
-        
-        # Create LLM
-        llm = ModelFactory.create_llm(config["llm"])
-        
-        # Create tools
-        tool_factory = ToolFactory()
-        tools = tool_factory.create_tools(config["tools"], llm)
-        
-        # Get recursion limit from config
-        recursion_limit = config.get("graph", {}).get("recursion_limit", 50)
-        
-        # Initialize agent service
-        agent_service = AgentService(llm, tools, recursion_limit)
+        # Prime the LLM connection so the first request does not pay for the handshake
+        await asyncio.to_thread(runtime.warmup)
         
         logging.info("Agent service initialized successfully")
-        logging.info(f"Available tools: {[tool.name for tool in tools]}")
-        logging.info(f"Recursion limit: {recursion_limit}")
+        logging.info("Available tools: %s", [tool.name for tool in tools])
+        logging.info("Recursion limit: %s", recursion_limit)
         
     except Exception as e:
-        logging.error(f"Failed to initialize agent service: {str(e)}")
+        logging.error("Failed to initialize agent service: %s", e)
         raise
 
 
@@ -178,21 +166,37 @@ async def process_query(request: QueryRequest, background_tasks: BackgroundTasks
     
     except Exception as e:
         # Handle unexpected errors
-        logging.error(f"Unexpected error processing query: {str(e)}")
+        logging.error("Unexpected error processing query: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @app.post("/query/stream")
 async def process_query_stream(request: QueryRequest):
-    """Process a query with streaming response (future implementation)"""
-    # TODO: Implement streaming response for real-time updates
-    raise HTTPException(status_code=501, detail="Streaming not yet implemented")
+    """Process a query, streaming the answer as plain text while it is generated"""
+    if not agent_service:
+        raise HTTPException(status_code=503, detail="Agent service not initialized")
+    
+    # Errors raised once streaming has started cannot change the status code, so check first
+    if request.agent_type not in agent_service.agent_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown agent type: {request.agent_type}. Available: {list(agent_service.agent_types.keys())}"
+        )
+    
+    # The generator blocks while the agent works; StreamingResponse iterates it in a worker thread
+    chunks = agent_service.stream_query(
+        query=request.query,
+        agent_type=request.agent_type,
+        thread_id=request.thread_id,
+        **request.parameters
+    )
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
 
 
 # Optional: Background tasks
 def cleanup_task(thread_id: str):
     """Background task for cleanup"""
-    logging.info(f"Cleanup task for thread: {thread_id}")
+    logging.info("Cleanup task for thread: %s", thread_id)
     # Add any cleanup logic here
 
 
@@ -200,7 +204,7 @@ def cleanup_task(thread_id: str):
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    logging.error(f"Global exception: {str(exc)}")
+    logging.error("Global exception: %s", exc)
     return HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -3,6 +3,7 @@ Integration tests for AgentService
 Tests the centralized agent management and service layer
 """
 
+import logging
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 import sys
@@ -13,7 +14,23 @@ import shutil
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent_service import AgentService, LogCapture, TeeOutput
+from core.agent_service import AgentService, LogCapture, TeeOutput, _file_logger
+
+
+# Services log to this logger instead of logs/agent_logs.log, so test runs leave the tree clean
+_test_logger = logging.getLogger("agent_service.tests")
+_test_logger.addHandler(logging.NullHandler())
+_test_logger.propagate = False
+_test_logger.setLevel(logging.INFO)
+_file_logger_patch = patch('core.agent_service._file_logger', return_value=_test_logger)
+
+
+def setUpModule():
+    _file_logger_patch.start()
+
+
+def tearDownModule():
+    _file_logger_patch.stop()
 
 
 class TestLogCapture(unittest.TestCase):
@@ -41,6 +58,57 @@ class TestLogCapture(unittest.TestCase):
         self.assertEqual(len(logs), 1)
         self.assertIn("Live test message", logs[0])
     
+    def test_captured_output_is_bounded(self):
+        """Test that long output keeps only the most recent part"""
+        from core.agent_service import MAX_CAPTURED_CHARS
+        
+        with LogCapture(show_live=False) as capture:
+            for i in range(MAX_CAPTURED_CHARS // 1000 + 10):
+                print(f"line {i:06d} " + "x" * 988)
+            print("last line")
+        
+        logs = capture.get_logs()
+        self.assertLessEqual(len(logs[0]), MAX_CAPTURED_CHARS)
+        self.assertTrue(logs[0].startswith("[Earlier output truncated]"))
+        self.assertTrue(logs[0].endswith("last line"))
+        self.assertNotIn("line 000000", logs[0])
+    
+    def test_log_lines_are_bounded(self):
+        """Test that only the most recent log lines are kept"""
+        from core.agent_service import MAX_LOG_LINES
+        
+        with LogCapture(show_live=False) as capture:
+            for i in range(MAX_LOG_LINES + 5):
+                capture.add_log(f"step {i}")
+        
+        logs = capture.get_logs()
+        self.assertEqual(len(logs), MAX_LOG_LINES)
+        self.assertTrue(logs[-1].endswith(f"step {MAX_LOG_LINES + 4}"))
+        self.assertTrue(logs[0].endswith("step 5"))
+    
+    def test_concurrent_captures_are_isolated(self):
+        """Test that captures in parallel threads do not see each other's output"""
+        import threading
+        
+        barrier = threading.Barrier(2)
+        captures = {}
+        
+        def worker(name):
+            with LogCapture(show_live=False) as capture:
+                barrier.wait()
+                print(f"output from {name}")
+                barrier.wait()
+            captures[name] = capture.get_logs()
+        
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(captures["first"], ["output from first"])
+        self.assertEqual(captures["second"], ["output from second"])
+    
     def test_tee_output(self):
         """Test TeeOutput functionality"""
         # Mock streams
@@ -49,15 +117,20 @@ class TestLogCapture(unittest.TestCase):
         
         tee = TeeOutput(original_stream, string_buffer)
         
-        # Test write
+        # Test write - text is held back until a newline completes the line
         result = tee.write("test")
-        
-        original_stream.write.assert_called_once_with("test")
-        string_buffer.write.assert_called_once_with("test")
         self.assertEqual(result, 4)  # Length of "test"
+        original_stream.write.assert_not_called()
         
-        # Test flush
+        tee.write("\n")
+        original_stream.write.assert_called_once_with("test\n")
+        string_buffer.write.assert_called_once_with("test\n")
+        
+        # Test flush - pending text is forwarded first
+        tee.write("partial")
         tee.flush()
+        original_stream.write.assert_called_with("partial")
+        string_buffer.write.assert_called_with("partial")
         original_stream.flush.assert_called_once()
         string_buffer.flush.assert_called_once()
 
@@ -98,6 +171,20 @@ class TestAgentService(unittest.TestCase):
         expected_types = {"standard", "advanced"}
         self.assertEqual(set(self.service.agent_types.keys()), expected_types)
     
+    def test_file_logger_is_configured_once(self):
+        """Test that repeated calls do not add file handlers"""
+        logger = logging.Logger("agent_service")
+        with patch('core.agent_service.logging.getLogger', return_value=logger), \
+             patch('core.agent_service.TimedRotatingFileHandler', return_value=logging.NullHandler()) as mock_handler, \
+             patch('core.agent_service.QueueListener'), \
+             patch('core.agent_service.os.makedirs'):
+            first = _file_logger()
+            second = _file_logger()
+        
+        self.assertIs(first, second)
+        self.assertEqual(len(logger.handlers), 1)
+        mock_handler.assert_called_once()
+    
     def test_get_available_agent_types(self):
         """Test getting available agent types"""
         agent_types = self.service.get_available_agent_types()
@@ -133,10 +220,24 @@ class TestAgentService(unittest.TestCase):
             self.mock_llm,
             self.mock_tools,
             verbose=False,
-            recursion_limit=25
+            recursion_limit=25,
+            routing_llm=None
         )
         self.assertEqual(agent, mock_agent)
     
+    @patch('core.agent_service.create_advanced_agent')
+    def test_agents_are_reused(self, mock_create):
+        """Test that an agent is built once per configuration and reused"""
+        mock_create.side_effect = lambda *args, **kwargs: Mock()
+        
+        first = self.service._create_agent("advanced")
+        self.assertIs(self.service._create_agent("advanced"), first)
+        self.assertIsNot(self.service._create_agent("advanced", verbose=True), first)
+        self.assertEqual(mock_create.call_count, 2)
+        
+        self.service.invalidate_agents()
+        self.assertIsNot(self.service._create_agent("advanced"), first)
+    
     def test_create_invalid_agent(self):
         """Test creating invalid agent type raises error"""
         with self.assertRaises(ValueError) as context:
@@ -260,6 +361,133 @@ class TestAgentService(unittest.TestCase):
             self.assertIsInstance(thread_id, str)
             self.assertIn("session_", thread_id)
     
+    @patch('core.agent_service.create_standard_agent')
+    def test_process_query_uses_response_cache(self, mock_create):
+        """Test that cached answers skip agent creation"""
+        mock_agent = Mock()
+        mock_agent.name = "🔧 Test Agent"
+        mock_agent.process.return_value = "Fresh response"
+        mock_create.return_value = mock_agent
+        
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.return_value = None
+        
+        result = self.service.process_query("test query", "standard")
+        self.assertEqual(result["answer"], "Fresh response")
+        self.service.response_cache.put.assert_called_once_with("test query", "Fresh response", "standard")
+        
+        self.service.response_cache.get.return_value = "Cached response"
+        result = self.service.process_query("test query", "standard")
+        
+        self.assertEqual(result["answer"], "Cached response")
+        self.assertTrue(result["metadata"]["cache_hit"])
+        mock_create.assert_called_once()
+    
+    def test_cache_lookup_errors_are_reported(self):
+        """Test that a failing cache lookup yields an error response instead of raising"""
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.side_effect = RuntimeError("cache unavailable")
+        
+        result = self.service.process_query("test query", "standard")
+        
+        self.assertEqual(result["metadata"]["status"], "error")
+        self.assertIn("cache unavailable", result["answer"])
+    
+    @patch('core.agent_service.create_advanced_agent')
+    def test_incomplete_answers_are_not_cached(self, mock_create):
+        """Test that error and draft answers are returned with a status but never cached"""
+        from core.agent_interface import IncompleteAnswer
+        
+        mock_agent = Mock()
+        mock_agent.name = "🎯 Test Agent"
+        mock_agent.process.return_value = IncompleteAnswer("An unexpected error occurred during research: boom")
+        mock_agent.process_stream.return_value = iter(["Partial ", IncompleteAnswer("error")])
+        mock_create.return_value = mock_agent
+        
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.return_value = None
+        
+        result = self.service.process_query("test query", "advanced", recursion_limit=7)
+        list(self.service.stream_query("test query", "advanced", recursion_limit=7))
+        
+        self.assertEqual(result["metadata"]["status"], "incomplete")
+        self.service.response_cache.get.assert_called_with("test query", "advanced:7")
+        self.service.response_cache.put.assert_not_called()
+    
+    @patch('core.agent_service.create_standard_agent')
+    def test_response_cache_is_skipped_when_not_applicable(self, mock_create):
+        """Test that cache=False and a sampling temperature bypass the response cache"""
+        mock_agent = Mock()
+        mock_agent.name = "🔧 Test Agent"
+        mock_agent.process.return_value = "Fresh response"
+        mock_create.return_value = mock_agent
+        
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.return_value = "Cached response"
+        
+        result = self.service.process_query("test query", "standard", cache=False)
+        self.assertEqual(result["answer"], "Fresh response")
+        
+        self.mock_llm.temperature = 0.7
+        result = self.service.process_query("test query", "standard")
+        self.assertEqual(result["answer"], "Fresh response")
+        
+        self.service.response_cache.get.assert_not_called()
+        self.service.response_cache.put.assert_not_called()
+        mock_create.assert_called_with(self.mock_llm, self.mock_tools, verbose=False)
+    
+    @patch('core.agent_service.create_standard_agent')
+    def test_stream_query_yields_agent_chunks(self, mock_create):
+        """Test that stream_query forwards chunks and caches the joined answer"""
+        mock_agent = Mock()
+        mock_agent.process_stream.return_value = iter(["Par", "is"])
+        mock_create.return_value = mock_agent
+        
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.return_value = None
+        
+        chunks = list(self.service.stream_query("capital of France", "standard", thread_id="t1"))
+        
+        self.assertEqual(chunks, ["Par", "is"])
+        mock_agent.process_stream.assert_called_once_with("capital of France", "t1")
+        self.service.response_cache.put.assert_called_once_with("capital of France", "Paris", "standard")
+    
+    @patch('core.agent_service.create_standard_agent')
+    def test_stream_query_reports_errors(self, mock_create):
+        """Test that an error during streaming ends the stream with an error chunk"""
+        from core.agent_interface import IncompleteAnswer
+        
+        def failing_stream(query, thread_id):
+            yield "Par"
+            raise RuntimeError("connection lost")
+        
+        mock_agent = Mock()
+        mock_agent.process_stream.side_effect = failing_stream
+        mock_create.return_value = mock_agent
+        
+        self.service.response_cache = Mock()
+        self.service.response_cache.get.return_value = None
+        
+        chunks = list(self.service.stream_query("capital of France", "standard"))
+        
+        self.assertEqual(chunks[0], "Par")
+        self.assertIsInstance(chunks[1], IncompleteAnswer)
+        self.assertIn("connection lost", chunks[1])
+        self.service.response_cache.put.assert_not_called()
+    
+    @patch('core.agent_service.create_standard_agent')
+    def test_process_queries_preserves_order(self, mock_create):
+        """Test that concurrently processed queries return results in input order"""
+        mock_agent = Mock()
+        mock_agent.name = "🔧 Test Agent"
+        mock_agent.process.side_effect = lambda query, thread_id: f"answer to {query}"
+        mock_create.return_value = mock_agent
+        
+        results = self.service.process_queries(["q1", "q2", "q3"], "standard")
+        
+        self.assertEqual([r["answer"] for r in results], ["answer to q1", "answer to q2", "answer to q3"])
+        self.assertEqual([r["metadata"]["thread_id"] for r in results], ["batch_1", "batch_2", "batch_3"])
+    
     @patch('core.agent_service.time.time')
     def test_execution_timing(self, mock_time):
         """Test execution time measurement"""
@@ -347,6 +575,7 @@ class TestAgentServiceIntegration(unittest.TestCase):
             ]
             for key in required_metadata:
                 self.assertIn(key, metadata)
+            self.assertIsInstance(metadata["tools_available"], list)
             
             # Verify agent was called correctly
             mock_agent.process.assert_called_once_with("Integration test query", "integration_test")
@@ -3,15 +3,16 @@ Unit tests for agent implementations
 Tests the agent interface and both standard and langgraph agents
 """
 
+import asyncio
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent_interface import AgentInterface
+from core.agent_interface import AgentInterface, IncompleteAnswer
 from core.standard_agent import StandardAgent, create_standard_agent
 from core.advanced_agent import AdvancedResearchAgent, create_advanced_agent
 
@@ -48,7 +49,7 @@ class TestStandardAgent(unittest.TestCase):
         
         # Create agent with patched initialization to avoid LangChain setup
         with patch('core.standard_agent.create_openai_functions_agent'), \
-             patch('core.standard_agent.AgentExecutor'):
+             patch('core.standard_agent.DedupAgentExecutor'):
             self.agent = StandardAgent(self.mock_llm, self.mock_tools, verbose=False)
     
     def test_implements_interface(self):
@@ -100,6 +101,43 @@ class TestStandardAgent(unittest.TestCase):
         self.assertIn("Error", result)
         self.assertIn("Test error", result)
     
+    def test_process_stream_yields_tokens(self):
+        """Test that process_stream yields the answer incrementally"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="Hello streaming world")]))
+        agent = StandardAgent(llm, [], verbose=False)
+        
+        chunks = list(agent.process_stream("test query"))
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "Hello streaming world")
+    
+    def test_process_stream_marks_tool_turn_text(self):
+        """Test that text of a tool-calling turn is followed by an IncompleteAnswer separator"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.tools import tool
+        
+        @tool
+        def lookup(query: str) -> str:
+            """Look up a query"""
+            return "Paris"
+        
+        llm = GenericFakeChatModel(messages=iter([
+            AIMessage(content="Let me check.", additional_kwargs={
+                "function_call": {"name": "lookup", "arguments": '{"query": "capital of France"}'}
+            }),
+            AIMessage(content="The capital is Paris"),
+        ]))
+        agent = StandardAgent(llm, [lookup], verbose=False)
+        
+        chunks = list(agent.process_stream("What is the capital of France?"))
+        
+        self.assertEqual("".join(chunks), "Let me check.\n\nThe capital is Paris")
+        self.assertTrue(any(isinstance(chunk, IncompleteAnswer) for chunk in chunks))
+    
     def test_factory_function(self):
         """Test the create_standard_agent factory function"""
         agent = create_standard_agent(self.mock_llm, self.mock_tools)
@@ -120,14 +158,13 @@ class TestAdvancedAgent(unittest.TestCase):
         # Use empty tools list
         self.mock_tools = []
         
-        # Create agent with patched initialization to avoid LangGraph setup
-        with patch('core.advanced_agent.StateGraph'):
-            self.agent = AdvancedResearchAgent(
-                self.mock_llm, 
-                self.mock_tools, 
-                verbose=False, 
-                recursion_limit=5  # Small limit for testing
-            )
+        # The LangGraph workflow is built lazily, so creating the agent needs no setup
+        self.agent = AdvancedResearchAgent(
+            self.mock_llm, 
+            self.mock_tools, 
+            verbose=False, 
+            recursion_limit=5  # Small limit for testing
+        )
     
     def test_implements_interface(self):
         """Test that AdvancedResearchAgent implements AgentInterface"""
@@ -146,15 +183,315 @@ class TestAdvancedAgent(unittest.TestCase):
     
     def test_graph_is_created(self):
         """Test that the LangGraph workflow is created"""
-        # Since we mock StateGraph, we just verify that the graph attribute exists
+        # The graph is built on first access
+        self.assertIsNone(self.agent._graph)
         self.assertIsNotNone(self.agent.graph)
-    
+
+    def test_compiled_graph_is_shared(self):
+        """Test that agents without checkpoints reuse one compiled graph"""
+        other = AdvancedResearchAgent(self.mock_llm, self.mock_tools, verbose=False)
+        checkpointed = AdvancedResearchAgent(self.mock_llm, self.mock_tools, verbose=False, enable_checkpoints=True)
+
+        self.assertIs(other.graph, self.agent.graph)
+        self.assertIsNot(checkpointed.graph, self.agent.graph)
+        self.assertIs(checkpointed.graph.checkpointer, checkpointed.checkpointer)
+
+    def test_checkpoints_only_final_state(self):
+        """Test that a checkpointed run stores a single checkpoint rather than one per step"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+
+        llm = GenericFakeChatModel(messages=iter([
+            AIMessage(content="DIRECT"),
+            AIMessage(content="DIRECT"),
+            AIMessage(content="Paris"),
+        ]))
+        agent = AdvancedResearchAgent(llm, [], verbose=False, enable_checkpoints=True)
+
+        self.assertEqual(agent.process("Capital of France?", "ckpt_thread"), "Paris")
+        checkpoints = list(agent.checkpointer.list({"configurable": {"thread_id": "ckpt_thread"}}))
+        self.assertEqual(len(checkpoints), 1)
+
     def test_tools_dictionary_created(self):
         """Test that tools are properly converted to dictionary"""
         self.assertIsInstance(self.agent.tools, dict)
         # With empty tools list, dictionary should be empty
         self.assertEqual(len(self.agent.tools), 0)
     
+    def test_classify_and_plan_sends_prompts_together(self):
+        """Test that classification and planning are both requested, with a capped classification reply"""
+        from core.advanced_agent import ROUTING_MAX_TOKENS
+        
+        self.mock_llm.ainvoke = AsyncMock(side_effect=lambda messages, **kwargs: Mock(
+            content="RESEARCH" if kwargs else "Search for X"
+        ))
+        
+        result = asyncio.run(self.agent._classify_and_plan({"query": "What is X?"}))
+        
+        self.assertEqual(self.mock_llm.ainvoke.call_count, 2)
+        self.assertEqual(self.mock_llm.ainvoke.call_args_list[0].kwargs, {"max_tokens": ROUTING_MAX_TOKENS})
+        prompts = [call.args[0] for call in self.mock_llm.ainvoke.call_args_list]
+        # Static instructions come first, the query only in the trailing human message
+        for messages in prompts:
+            self.assertNotIn("What is X?", messages[0].content)
+            self.assertEqual(messages[-1].content, "What is X?")
+        self.assertEqual(result["next_action"], "research")
+        self.assertEqual(result["research_plan"], "Search for X")
+    
+    def test_routing_replies_are_parsed_defensively(self):
+        """Test that a wordy reply is understood and a truncated one is logged, not cached"""
+        from langchain_core.messages import AIMessage
+        from core.advanced_agent import _routing_label
+        
+        self.assertEqual(_routing_label(AIMessage(content="The query is RESEARCH."), ("RESEARCH", "DIRECT")), "RESEARCH")
+        
+        truncated = AIMessage(content="<think>The user asks", response_metadata={"finish_reason": "length"})
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(_routing_label(truncated, ("RESEARCH", "DIRECT")))
+        self.assertIn("truncated", logs.output[0])
+    
+    def test_classify_and_plan_drops_plan_for_direct_queries(self):
+        """Test that a direct query skips the research plan"""
+        self.mock_llm.ainvoke = AsyncMock(side_effect=lambda messages, **kwargs: Mock(
+            content="DIRECT" if kwargs else "Search for X"
+        ))
+        
+        result = asyncio.run(self.agent._classify_and_plan({"query": "What is 2+2?"}))
+        
+        self.assertEqual(result["next_action"], "direct")
+        self.assertNotIn("research_plan", result)
+
+    def test_obvious_queries_skip_classification_call(self):
+        """Test that pattern-matched queries are classified without the LLM"""
+        from core.advanced_agent import _classify_by_pattern
+
+        self.assertEqual(_classify_by_pattern("Translate 'hello' to French"), "direct")
+        self.assertEqual(_classify_by_pattern("latest news about the Mars mission"), "research")
+        self.assertIsNone(_classify_by_pattern("Convert the latest exchange rate to PLN"))
+        self.assertIsNone(_classify_by_pattern("Who wrote Hamlet?"))
+        # Dates, versions and ranges are not arithmetic
+        self.assertIsNone(_classify_by_pattern("Windows 10/11 differences"))
+        self.assertEqual(_classify_by_pattern("covid 2020-2021 deaths"), "research")
+        self.assertEqual(_classify_by_pattern("2024-10"), "research")
+        self.assertEqual(_classify_by_pattern("calculate (2+3)*4"), "direct")
+
+        self.mock_llm.ainvoke = AsyncMock(return_value=Mock(content="Search for news"))
+
+        direct = asyncio.run(self.agent._classify_and_plan({"query": "What is 17 * 23?"}))
+        research = asyncio.run(self.agent._classify_and_plan({"query": "Today's news in Warsaw"}))
+
+        self.assertEqual(direct["next_action"], "direct")
+        self.assertEqual(research["next_action"], "research")
+        self.assertEqual(research["research_plan"], "Search for news")
+        # Only the plan of the research query is requested
+        self.mock_llm.ainvoke.assert_called_once()
+
+    def test_routing_llm_classifies_query(self):
+        """Test that a separate routing model classifies while the main model plans"""
+        routing_llm = Mock()
+        routing_llm.ainvoke = AsyncMock(return_value=Mock(content="RESEARCH"))
+        self.mock_llm.ainvoke = AsyncMock(return_value=Mock(content="Search for Y"))
+        agent = AdvancedResearchAgent(self.mock_llm, self.mock_tools, verbose=False, routing_llm=routing_llm)
+
+        result = asyncio.run(agent._classify_and_plan({"query": "What is Y?"}))
+
+        routing_llm.ainvoke.assert_called_once()
+        self.mock_llm.ainvoke.assert_called_once()
+        self.assertEqual(result["next_action"], "research")
+        self.assertEqual(result["research_plan"], "Search for Y")
+
+    def test_decision_is_cached_across_agents(self):
+        """Test that an identical decision request does not call the LLM again"""
+        self.mock_llm.ainvoke = AsyncMock(return_value=Mock(content="CONTINUE"))
+        state = {"reflection": "The results describe the city and its history", "iteration_count": 1}
+        
+        first = asyncio.run(self.agent._decide_next_step(state))
+        other_agent = AdvancedResearchAgent(self.mock_llm, self.mock_tools, verbose=False)
+        second = asyncio.run(other_agent._decide_next_step(state))
+        
+        self.assertEqual(first["next_action"], "continue")
+        self.assertEqual(second["next_action"], "continue")
+        self.mock_llm.ainvoke.assert_called_once()
+    
+    def test_decision_heuristic_skips_llm(self):
+        """Test that clear reflections are decided without an LLM call"""
+        def decide(reflection, iteration_count):
+            state = {"reflection": reflection, "iteration_count": iteration_count}
+            return asyncio.run(self.agent._decide_next_step(state))
+        
+        missing = decide("Population data is missing", 1)
+        sufficient = decide("The results are sufficient", 1)
+        at_limit = decide("Population data is missing", 3)
+        
+        self.assertEqual(missing["next_action"], "continue")
+        self.assertEqual(sufficient["next_action"], "finish")
+        self.assertEqual(at_limit["next_action"], "finish")
+        self.mock_llm.ainvoke.assert_not_called()
+    
+    def test_planned_queries_are_searched(self):
+        """Test that every planned search query is executed and results are combined"""
+        from core.advanced_agent import _parse_search_queries
+        
+        queries = _parse_search_queries('Plan: ["France capital", "Paris population", "France capital"]', "fallback")
+        self.assertEqual(queries, ["France capital", "Paris population"])
+        self.assertEqual(_parse_search_queries("no list here", "fallback"), ["fallback"])
+        
+        search_tool = Mock()
+        search_tool.name = "DuckDuckGo"
+        search_tool.func.side_effect = lambda query: f"results for {query}"
+        self.agent.tools = {"DuckDuckGo": search_tool}
+        
+        result = asyncio.run(self.agent._execute_search({
+            "query": "France", "search_queries": queries, "iteration_count": 0
+        }))
+        
+        self.assertEqual(search_tool.func.call_count, 2)
+        self.assertEqual(result["search_results"]["snippets"],
+                         ["results for France capital", "results for Paris population"])
+        self.assertEqual(result["search_results"]["sources"], ["France capital", "Paris population"])
+        self.assertEqual(result["iteration_count"], 1)
+
+    def test_prefixed_queries_use_other_tools(self):
+        """Test that planned queries prefixed with a tool name run on that tool in the same step"""
+        search_tool = Mock()
+        search_tool.name = "DuckDuckGo"
+        search_tool.func.side_effect = lambda query: f"web: {query}"
+        wiki_tool = Mock()
+        wiki_tool.name = "Wikipedia"
+        wiki_tool.func.side_effect = lambda query: f"wiki: {query}"
+        self.agent.tools = {"DuckDuckGo": search_tool, "Wikipedia": wiki_tool}
+
+        result = asyncio.run(self.agent._execute_search({
+            "query": "Eiffel Tower", "iteration_count": 0,
+            "search_queries": ["Eiffel Tower tickets", "wikipedia: Eiffel Tower"]
+        }))
+
+        search_tool.func.assert_called_once_with(query="Eiffel Tower tickets")
+        wiki_tool.func.assert_called_once_with(query="Eiffel Tower")
+        self.assertEqual(result["search_results"]["snippets"], ["web: Eiffel Tower tickets", "wiki: Eiffel Tower"])
+
+    def test_tool_output_is_captured(self):
+        """Test that output printed by tools on the search pool reaches the caller's log capture"""
+        from core.agent_service import LogCapture
+
+        search_tool = Mock()
+        search_tool.name = "DuckDuckGo"
+        search_tool.func.side_effect = lambda query: print(f"searching {query}") or "result"
+        self.agent.tools = {"DuckDuckGo": search_tool}
+
+        with LogCapture(show_live=False) as capture:
+            asyncio.run(self.agent._execute_search({
+                "query": "Eiffel Tower", "iteration_count": 0, "search_queries": ["Eiffel Tower"]
+            }))
+
+        self.assertIn("searching Eiffel Tower", " ".join(capture.get_logs()))
+
+    def test_last_iteration_skips_reflection(self):
+        """Test that the final permitted search goes straight to synthesis"""
+        from core.advanced_agent import MAX_SEARCH_ITERATIONS
+
+        self.assertEqual(self.agent._should_reflect({"iteration_count": 1}), "reflect")
+        self.assertEqual(self.agent._should_reflect({"iteration_count": MAX_SEARCH_ITERATIONS}), "finish")
+
+    def test_search_results_are_deduplicated_and_ranked(self):
+        """Test that repeated snippets are stored once and synthesis gets the most relevant ones first"""
+        from core.advanced_agent import _add_search_results, _empty_search_results
+        
+        results = _add_search_results(_empty_search_results(), [
+            ("paris", "The Eiffel Tower is in Paris\n\nParis has 2.1 million inhabitants"),
+            ("france", "Paris  has 2.1 million INHABITANTS\n\nFrance borders Spain")
+        ], iteration=1)
+        
+        self.assertEqual(results["snippets"], [
+            "The Eiffel Tower is in Paris", "Paris has 2.1 million inhabitants", "France borders Spain"
+        ])
+        self.assertEqual(len(results["hashes"]), 3)
+        
+        state = {"query": "How many inhabitants does Paris have?", "search_results": results, "iteration_count": 1}
+        snippets = self.agent._relevant_snippets(state, top_k=2)
+        self.assertEqual(snippets, ["[paris] Paris has 2.1 million inhabitants", "[paris] The Eiffel Tower is in Paris"])
+    
+    def test_process_stream_yields_synthesis_tokens(self):
+        """Test that only the synthesized answer is streamed, in several chunks"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        
+        # Classification and planning run concurrently, so both get a DIRECT reply
+        llm = GenericFakeChatModel(messages=iter([
+            AIMessage(content="DIRECT"),
+            AIMessage(content="DIRECT"),
+            AIMessage(content="Hello streaming world"),
+        ]))
+        agent = AdvancedResearchAgent(llm, [], verbose=False)
+        
+        chunks = list(agent.process_stream("Say hello to the streaming test", "stream_thread"))
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), "Hello streaming world")
+    
+    def test_synthesis_goes_through_llm_cache(self):
+        """Test that a repeated non-streaming synthesis is answered from the LLM cache"""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.caches import InMemoryCache
+        from langchain_core.messages import AIMessage
+        
+        # The fake model has a single reply, so a second synthesis only succeeds from the cache
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="Cached answer")]), cache=InMemoryCache())
+        agent = AdvancedResearchAgent(llm, [], verbose=False)
+        state = {"query": "What is LangGraph?", "iteration_count": 1}
+        
+        first = asyncio.run(agent._synthesize_answer(state))
+        second = asyncio.run(agent._synthesize_answer(state))
+        
+        self.assertEqual(first["final_answer"], "Cached answer")
+        self.assertEqual(second, first)
+    
+    def test_recursion_limit_uses_tracked_state(self):
+        """Test that the draft answer sees search results without checkpointing"""
+        search_tool = Mock()
+        search_tool.name = "DuckDuckGo"
+        search_tool.func.return_value = "Paris has 2.1 million inhabitants"
+        llm = Mock()
+        # Classification is the capped call, planning the one with the planning instructions
+        llm.ainvoke = AsyncMock(side_effect=lambda messages, **kwargs: Mock(
+            content="RESEARCH" if kwargs else
+            '["Paris population"]' if "Plan the web research" in messages[0].content else "Draft answer"
+        ))
+        
+        agent = AdvancedResearchAgent(llm, [search_tool], verbose=False, recursion_limit=3)
+        answer = agent.process("How many people live in Paris?", "limit_thread")
+        
+        self.assertIsNone(agent.checkpointer)
+        self.assertEqual(answer, "Draft answer")
+        draft_prompt = llm.ainvoke.call_args[0][0][0].content
+        self.assertIn("Paris has 2.1 million inhabitants", draft_prompt)
+    
+    def test_search_results_are_compacted(self):
+        """Test that duplicate results are dropped and the prompt context is capped"""
+        results = ["Paris is the capital", "  paris IS the capital ", "a" * 1500, "b" * 1500]
+        
+        compacted = self.agent._compact_search_results(results, max_chars=1500, max_result_chars=1000)
+        
+        self.assertEqual(compacted.split("\n"), ["Paris is the capital", "a" * 1000, "b" * 478])
+        self.assertEqual(len(compacted), 1500)
+    
+    def test_identical_tool_calls_run_once(self):
+        """Test that repeated tool calls within a query reuse the first result"""
+        search_tool = Mock()
+        search_tool.name = "DuckDuckGo"
+        search_tool.func.return_value = "Paris"
+        
+        call_cache = {}
+        first = self.agent._call_tool(call_cache, search_tool, query="capital of France")
+        second = self.agent._call_tool(call_cache, search_tool, query="capital of France")
+        
+        self.assertEqual(first, second)
+        search_tool.func.assert_called_once_with(query="capital of France")
+        
+        # Another run starts with its own results
+        self.agent._call_tool({}, search_tool, query="capital of France")
+        self.assertEqual(search_tool.func.call_count, 2)
+    
     def test_factory_function(self):
         """Test the create_advanced_agent factory function"""
         agent = create_advanced_agent(self.mock_llm, self.mock_tools, verbose=False)
@@ -163,6 +500,121 @@ class TestAdvancedAgent(unittest.TestCase):
         self.assertIsInstance(agent, AgentInterface)
 
 
+class TestDedupAgentExecutor(unittest.TestCase):
+    """Test tool call deduplication in the agent executor"""
+    
+    def test_identical_tool_calls_run_once(self):
+        """Test that an identical tool call within a run reuses the observation"""
+        from langchain_core.agents import AgentAction
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.tools import tool
+        from core.agent_executor import _dedup_run
+        
+        calls = []
+        
+        @tool
+        def lookup(query: str) -> str:
+            """Look up a query"""
+            calls.append(query)
+            return f"result for {query}"
+        
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="done")]))
+        executor = StandardAgent(llm, [lookup], verbose=False).agent_executor
+        action = AgentAction(tool="lookup", tool_input={"query": "x"}, log="")
+        
+        with _dedup_run():
+            steps = [
+                executor._perform_agent_action({"lookup": lookup}, {"lookup": "blue"}, action)
+                for _ in range(2)
+            ]
+        
+        self.assertEqual(calls, ["x"])
+        self.assertEqual(steps[1].observation, "result for x")
+        
+        # Another run does not see the observations of the previous one
+        with _dedup_run():
+            executor._perform_agent_action({"lookup": lookup}, {"lookup": "blue"}, action)
+        self.assertEqual(calls, ["x", "x"])
+
+
+class TestBindTools(unittest.TestCase):
+    """Test the cache of LLMs bound to a tool set"""
+    
+    def test_bindings_are_reused_and_bounded(self):
+        """Test that a binding is reused and old bindings are released"""
+        from core import agent_factory
+        
+        llms = [Mock() for _ in range(agent_factory._BOUND_LLM_CACHE_SIZE + 1)]
+        with patch.dict(agent_factory._BOUND_LLM_CACHE, clear=True):
+            first = agent_factory._bind_tools(llms[0], [])
+            self.assertIs(agent_factory._bind_tools(llms[0], []), first)
+            
+            for llm in llms[1:]:
+                agent_factory._bind_tools(llm, [])
+            
+            self.assertEqual(len(agent_factory._BOUND_LLM_CACHE), agent_factory._BOUND_LLM_CACHE_SIZE)
+            self.assertNotIn((id(llms[0]), ()), agent_factory._BOUND_LLM_CACHE)
+            llms[0].bind_tools.assert_called_once_with([])
+
+
+class TestIncrementalScratchpad(unittest.TestCase):
+    """Test the incremental agent scratchpad formatter"""
+    
+    def test_only_new_steps_are_formatted(self):
+        """Test that each step is formatted once while the run continues"""
+        from core.agent_factory import _IncrementalScratchpad
+        
+        formatted = []
+        
+        def format_steps(steps):
+            formatted.extend(steps)
+            return [observation for _, observation in steps]
+        
+        scratchpad = _IncrementalScratchpad(format_steps)
+        steps = []
+        for i in range(3):
+            steps.append((Mock(), f"observation {i}"))
+            messages = scratchpad({"intermediate_steps": steps})
+        
+        self.assertEqual(messages, ["observation 0", "observation 1", "observation 2"])
+        self.assertEqual(len(formatted), 3)
+        
+        # A new run starts from scratch
+        self.assertEqual(scratchpad({"intermediate_steps": [(Mock(), "other")]}), ["other"])
+    
+    def test_interleaved_runs_are_kept_apart(self):
+        """Test that runs sharing one scratchpad keep their own progress"""
+        from core.agent_factory import _IncrementalScratchpad
+        
+        formatted = []
+        
+        def format_steps(steps):
+            formatted.extend(steps)
+            return [observation for _, observation in steps]
+        
+        scratchpad = _IncrementalScratchpad(format_steps)
+        first, second = [], []
+        for i in range(2):
+            first.append((Mock(), f"first {i}"))
+            second.append((Mock(), f"second {i}"))
+            first_messages = scratchpad({"intermediate_steps": first})
+            second_messages = scratchpad({"intermediate_steps": second})
+        
+        self.assertEqual(first_messages, ["first 0", "first 1"])
+        self.assertEqual(second_messages, ["second 0", "second 1"])
+        self.assertEqual(len(formatted), 4)
+    
+    def test_empty_observations_are_kept(self):
+        """Test that non-string observations are serialized without dropping empty values"""
+        from core.agent_factory import _serialize_steps
+        
+        action = Mock()
+        steps = _serialize_steps([(action, {"results": [], "note": None})])
+        
+        self.assertEqual(steps, [(action, '{"results":[],"note":null}')])
+
+
 class TestAgentComparison(unittest.TestCase):
     """Test comparison between agent types"""
     
@@ -177,16 +629,15 @@ class TestAgentComparison(unittest.TestCase):
         
         # Create both agents with patched initialization
         with patch('core.standard_agent.create_openai_functions_agent'), \
-             patch('core.standard_agent.AgentExecutor'):
+             patch('core.standard_agent.DedupAgentExecutor'):
             self.standard_agent = StandardAgent(self.mock_llm, self.mock_tools, verbose=False)
         
-        with patch('core.advanced_agent.StateGraph'):
-            self.advanced_agent = AdvancedResearchAgent(
-                self.mock_llm, 
-                self.mock_tools, 
-                verbose=False, 
-                recursion_limit=5
-            )
+        self.advanced_agent = AdvancedResearchAgent(
+            self.mock_llm, 
+            self.mock_tools, 
+            verbose=False, 
+            recursion_limit=5
+        )
     
     def test_both_implement_interface(self):
         """Test that both agents implement the same interface"""
@@ -0,0 +1,78 @@
+"""
+Unit tests for the LLM response cache
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.outputs import Generation
+
+from core.llm_cache import LLMCache, _temperature
+
+MODEL = '{"kwargs": {"model_name": "gpt-4o", "temperature": 0.0}}---[(\'stop\', None)]'
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test the LLMCache class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = LLMCache(maxsize=2, ttl=60)
+        self.response = [Generation(text="Paris")]
+
+    def test_identical_request_hits(self):
+        """Test that only the same prompt on the same model configuration is a hit"""
+        # LangChain ignores falsy caches, so an empty cache must still be truthy
+        self.assertTrue(self.cache)
+        self.cache.update("capital of France", MODEL, self.response)
+
+        self.assertEqual(self.cache.lookup("capital of France", MODEL), self.response)
+        self.assertIsNone(self.cache.lookup("capital of Spain", MODEL))
+        self.assertIsNone(self.cache.lookup("capital of France", MODEL.replace("gpt-4o", "gpt-4o-mini")))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache keeps maxsize entries, dropping the least recently used"""
+        self.cache.update("a", MODEL, self.response)
+        self.cache.update("b", MODEL, self.response)
+        self.cache.lookup("a", MODEL)
+        self.cache.update("c", MODEL, self.response)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNotNone(self.cache.lookup("a", MODEL))
+        self.assertIsNone(self.cache.lookup("b", MODEL))
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are not served"""
+        self.cache.update("capital of France", MODEL, self.response)
+
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertIsNone(self.cache.lookup("capital of France", MODEL))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_sampled_requests_are_not_cached(self):
+        """Test that requests with a high temperature bypass the cache"""
+        sampled = MODEL + "[('temperature', 0.9)]"
+        self.cache.update("capital of France", sampled, self.response)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(_temperature(sampled), 0.9)
+        self.assertEqual(_temperature(MODEL), 0.0)
+        self.assertIsNone(_temperature("[('_type', 'fake')]"))
+
+    def test_requests_without_temperature_are_not_cached(self):
+        """Test that a provider default temperature is treated as sampled"""
+        unknown = "[('_type', 'fake')]"
+        self.cache.update("capital of France", unknown, self.response)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.lookup("capital of France", unknown))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -5,7 +5,7 @@ Simplified version using mocks to avoid LLM costs
 
 import os
 import sys
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -21,6 +21,7 @@ def test_recursion_limit_basic():
     # Mock LLM
     mock_llm = Mock()
     mock_llm.invoke.return_value = Mock(content="Mock LLM response")
+    mock_llm.ainvoke = AsyncMock(return_value=Mock(content="Mock LLM response"))
     
     # Mock tools
     mock_tools = []
@@ -32,43 +33,42 @@ def test_recursion_limit_basic():
     print("-" * 50)
     
     try:
-        with patch('core.advanced_agent.StateGraph'):
-            agent = AdvancedResearchAgent(mock_llm, mock_tools, verbose=True, recursion_limit=2)
+        agent = AdvancedResearchAgent(mock_llm, mock_tools, verbose=True, recursion_limit=2)
+        
+        # Mock the graph's ainvoke method to simulate GraphRecursionError
+        async def mock_invoke(*args, **kwargs):
+            from langgraph.errors import GraphRecursionError
+            raise GraphRecursionError("Recursion limit exceeded")
+        
+        agent.graph = Mock()
+        agent.graph.ainvoke = mock_invoke
+        agent.graph.get_state_history.return_value = []
+        
+        test_query = "Complex research query that should hit recursion limit"
+        print(f"🔍 Query: {test_query}")
+        
+        result = agent.process(test_query, "test_thread")
+        
+        print(f"✅ Test completed successfully")
+        print(f"📄 Result length: {len(result)} characters")
+        
+        # Check if it contains the expected draft response message
+        expected_markers = [
+            "DRAFT RESPONSE - INCOMPLETE DATA",
+            "DRAFT RESPONSE - INCOMPLETE RESEARCH",
+            "maximum allowed number of steps",
+            "iteration limit"
+        ]
+        
+        found_markers = [marker for marker in expected_markers if marker in result]
+        
+        if found_markers:
+            print("✅ Draft response mechanism triggered correctly")
+            print(f"📝 Found markers: {', '.join(found_markers)}")
+        else:
+            print("❌ Draft response mechanism failed")
+            print(f"📝 Result preview: {result[:200]}...")
             
-            # Mock the graph's invoke method to simulate GraphRecursionError
-            def mock_invoke(*args, **kwargs):
-                from langgraph.errors import GraphRecursionError
-                raise GraphRecursionError("Recursion limit exceeded")
-            
-            agent.graph = Mock()
-            agent.graph.invoke = mock_invoke
-            agent.graph.get_state_history.return_value = []
-            
-            test_query = "Complex research query that should hit recursion limit"
-            print(f"🔍 Query: {test_query}")
-            
-            result = agent.process(test_query, "test_thread")
-            
-            print(f"✅ Test completed successfully")
-            print(f"📄 Result length: {len(result)} characters")
-            
-            # Check if it contains the expected draft response message
-            expected_markers = [
-                "DRAFT RESPONSE - INCOMPLETE DATA",
-                "DRAFT RESPONSE - INCOMPLETE RESEARCH",
-                "maximum allowed number of steps",
-                "iteration limit"
-            ]
-            
-            found_markers = [marker for marker in expected_markers if marker in result]
-            
-            if found_markers:
-                print("✅ Draft response mechanism triggered correctly")
-                print(f"📝 Found markers: {', '.join(found_markers)}")
-            else:
-                print("❌ Draft response mechanism failed")
-                print(f"📝 Result preview: {result[:200]}...")
-                
     except Exception as e:
         print(f"❌ Test failed: {str(e)}")
         import traceback
@@ -0,0 +1,90 @@
+"""
+Unit tests for the shared runtime
+Factories are patched so no configuration file or API key is needed
+"""
+
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.runtime as runtime_module
+from core.runtime import get_runtime
+
+
+class TestRuntime(unittest.TestCase):
+    """Test the get_runtime singleton"""
+
+    def setUp(self):
+        """Reset the process-wide runtime"""
+        runtime_module._runtime = None
+
+    def tearDown(self):
+        """Reset the process-wide runtime"""
+        runtime_module._runtime = None
+
+    @patch('core.runtime.set_llm_cache')
+    @patch('core.runtime.get_llm_cache', return_value=None)
+    @patch('core.runtime.AgentService')
+    @patch('core.runtime.ToolFactory')
+    @patch('core.runtime.ModelFactory')
+    @patch('core.runtime.ConfigLoader')
+    @patch('core.runtime.load_dotenv')
+    def test_runtime_is_created_once(self, mock_dotenv, mock_config_loader, mock_model_factory,
+                                     mock_tool_factory, mock_agent_service, mock_get_cache, mock_set_cache):
+        """Test that repeated calls reuse the same components"""
+        mock_config_loader.load_config.return_value = {"llm": {}, "tools": [], "graph": {"recursion_limit": 7}}
+
+        first = get_runtime()
+        second = get_runtime()
+
+        self.assertIs(first, second)
+        mock_model_factory.create_llm.assert_called_once()
+        mock_agent_service.assert_called_once_with(
+            mock_model_factory.create_llm.return_value,
+            mock_tool_factory.return_value.create_tools.return_value,
+            7,
+            routing_llm=None
+        )
+        mock_set_cache.assert_called_once()
+
+    @patch('core.runtime.set_llm_cache')
+    @patch('core.runtime.get_llm_cache', return_value=None)
+    @patch('core.runtime.AgentService')
+    @patch('core.runtime.ToolFactory')
+    @patch('core.runtime.ModelFactory')
+    @patch('core.runtime.ConfigLoader')
+    @patch('core.runtime.load_dotenv')
+    def test_llm_cache_can_be_disabled(self, mock_dotenv, mock_config_loader, mock_model_factory,
+                                       mock_tool_factory, mock_agent_service, mock_get_cache, mock_set_cache):
+        """Test that llm.cache: false leaves the global LLM cache alone"""
+        mock_config_loader.load_config.return_value = {"llm": {"cache": False}, "tools": []}
+
+        get_runtime()
+
+        mock_set_cache.assert_not_called()
+
+    def test_warmup_failure_is_reported(self):
+        """Test that a failing warmup request does not raise"""
+        llm = Mock()
+        llm.ainvoke = AsyncMock(side_effect=RuntimeError("connection refused"))
+        runtime = runtime_module.Runtime({"llm": {"warmup": True}}, llm, [], Mock())
+
+        self.assertFalse(runtime.warmup())
+        llm.ainvoke.assert_awaited_once()
+
+    def test_warmup_is_opt_in(self):
+        """Test that no request is sent unless llm.warmup is enabled"""
+        llm = Mock()
+        llm.ainvoke = AsyncMock()
+        runtime = runtime_module.Runtime({"llm": {}}, llm, [], Mock())
+
+        self.assertFalse(runtime.warmup())
+        llm.ainvoke.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
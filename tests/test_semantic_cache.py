@@ -0,0 +1,223 @@
+"""
+Unit tests for response caching
+Uses a deterministic fake encoder so no embedding model is downloaded
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.semantic_cache import SemanticCache
+from core.response_cache import ResponseCache
+
+
+class FakeEncoder:
+    """Maps known phrases onto fixed unit vectors"""
+
+    VECTORS = {
+        "What is the capital of France?": [1.0, 0.0, 0.0],
+        "what's the capital of france": [0.99, 0.141, 0.0],
+        "How tall is Mount Everest?": [0.0, 0.0, 1.0],
+    }
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, normalize_embeddings=False, **kwargs):
+        self.calls += 1
+        if isinstance(text, list):
+            return np.vstack([self._vector(item, normalize_embeddings) for item in text])
+        return self._vector(text, normalize_embeddings)
+
+    def _vector(self, text, normalize):
+        vector = np.asarray(self.VECTORS[text], dtype=np.float32)
+        return vector / np.linalg.norm(vector) if normalize else vector
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test the SemanticCache class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.encoder = FakeEncoder()
+        self.cache = SemanticCache(encoder=self.encoder)
+
+    def test_empty_cache_misses(self):
+        """Test that an empty cache never returns an answer"""
+        self.assertIsNone(self.cache.get("What is the capital of France?"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_similar_query_hits(self):
+        """Test that a paraphrased query returns the stored answer"""
+        self.cache.put("What is the capital of France?", "Paris")
+
+        self.assertEqual(self.cache.get("what's the capital of france"), "Paris")
+
+    def test_dissimilar_query_misses(self):
+        """Test that an unrelated query is not answered from cache"""
+        self.cache.put("What is the capital of France?", "Paris")
+
+        self.assertIsNone(self.cache.get("How tall is Mount Everest?"))
+
+    def test_oldest_entries_are_evicted(self):
+        """Test that the cache keeps at most max_entries answers, dropping the oldest"""
+        cache = SemanticCache(encoder=self.encoder, max_entries=2)
+        cache.put("What is the capital of France?", "Paris")
+        cache.put("How tall is Mount Everest?", "8849 m")
+        cache.add_many(np.array([[0.0, 1.0, 0.0]]), ["Unrelated"])
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.E.shape[0], 2)
+        self.assertIsNone(cache.get("What is the capital of France?"))
+        self.assertEqual(cache.get("How tall is Mount Everest?"), "8849 m")
+
+    def test_embedding_reused_between_search_and_add(self):
+        """Test that one embedding serves both lookup and insertion"""
+        embedding = self.cache.embed("How tall is Mount Everest?")
+        self.assertIsNone(self.cache.search(embedding))
+        self.cache.add(embedding, "8849 m")
+
+        self.assertEqual(self.cache.search(embedding), "8849 m")
+        self.assertEqual(self.encoder.calls, 1)
+
+    def test_concurrent_search_and_add(self):
+        """Test that searches running alongside insertions and evictions never fail"""
+        import threading
+
+        cache = SemanticCache(encoder=self.encoder, max_entries=50)
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(500, 3)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        errors = []
+
+        def writer():
+            for i, vector in enumerate(vectors):
+                cache.add(vector, f"answer {i}")
+
+        def reader():
+            try:
+                for vector in vectors:
+                    cache.search(vector, max_age=60)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(cache), 50)
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the SQLite-backed ResponseCache class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "cache.sqlite")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.test_dir)
+
+    def test_exact_match_is_normalized(self):
+        """Test that whitespace and case do not affect exact lookups"""
+        cache = ResponseCache(self.db_path)
+        cache.put("What is the capital of France?", "Paris")
+
+        self.assertEqual(cache.get("  what is the capital of france?  "), "Paris")
+        self.assertIsNone(cache.get("How tall is Mount Everest?"))
+
+    def test_entries_persist_across_instances(self):
+        """Test that answers are reloaded from disk"""
+        ResponseCache(self.db_path).put("What is the capital of France?", "Paris")
+
+        reloaded = ResponseCache(self.db_path)
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.get("What is the capital of France?"), "Paris")
+
+    def test_semantic_fallback_uses_stored_embeddings(self):
+        """Test that stored embeddings serve paraphrased queries after reload"""
+        ResponseCache(self.db_path, SemanticCache(encoder=FakeEncoder())).put(
+            "What is the capital of France?", "Paris"
+        )
+
+        encoder = FakeEncoder()
+        reloaded = ResponseCache(self.db_path, SemanticCache(encoder=encoder))
+        self.assertEqual(reloaded.get("what's the capital of france"), "Paris")
+        self.assertEqual(encoder.calls, 1)
+
+    def test_expired_answers_are_not_served(self):
+        """Test that answers older than the TTL miss both exact and semantic lookups"""
+        cache = ResponseCache(self.db_path, SemanticCache(encoder=FakeEncoder()), ttl=60)
+        cache.put("What is the capital of France?", "Paris")
+        self.assertEqual(cache.get("what's the capital of france"), "Paris")
+
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get("What is the capital of France?"))
+            self.assertIsNone(cache.get("what's the capital of france"))
+            self.assertEqual(len(ResponseCache(self.db_path, ttl=60)), 0)
+
+    def test_expired_answers_are_deleted_on_load(self):
+        """Test that loading with a TTL removes expired rows from disk"""
+        ResponseCache(self.db_path).put("What is the capital of France?", "Paris")
+
+        with patch('time.time', return_value=time.time() + 120):
+            ResponseCache(self.db_path, ttl=60)
+
+        self.assertEqual(len(ResponseCache(self.db_path)), 0)
+
+    def test_get_many_embeds_misses_in_one_batch(self):
+        """Test that batch lookup encodes all exact misses with a single call"""
+        encoder = FakeEncoder()
+        cache = ResponseCache(self.db_path, SemanticCache(encoder=encoder))
+        cache.put("What is the capital of France?", "Paris")
+        encoder.calls = 0
+
+        results = cache.get_many([
+            "What is the capital of France?",
+            "what's the capital of france",
+            "How tall is Mount Everest?",
+        ])
+
+        self.assertEqual(results, ["Paris", "Paris", None])
+        self.assertEqual(encoder.calls, 1)
+
+    def test_pending_embeddings_are_bounded(self):
+        """Test that embeddings of queries that are never stored do not accumulate"""
+        from core import response_cache
+
+        cache = ResponseCache(self.db_path, SemanticCache(encoder=FakeEncoder()))
+        with patch.object(response_cache, 'MAX_PENDING_EMBEDDINGS', 1):
+            cache.get("What is the capital of France?")
+            cache.get("How tall is Mount Everest?")
+
+        self.assertEqual(list(cache._pending_embeddings), [cache.hash_query("How tall is Mount Everest?")])
+
+    def test_answers_are_scoped(self):
+        """Test that answers are only served within the scope they were stored under"""
+        cache = ResponseCache(self.db_path, SemanticCache(encoder=FakeEncoder()))
+        cache.put("What is the capital of France?", "Paris", "advanced:50")
+
+        self.assertIsNone(cache.get("What is the capital of France?", "standard"))
+        self.assertIsNone(cache.get("what's the capital of france", "standard"))
+        self.assertEqual(cache.get("what's the capital of france", "advanced:50"), "Paris")
+        reloaded = ResponseCache(self.db_path, SemanticCache(encoder=FakeEncoder()))
+        self.assertEqual(reloaded.get("What is the capital of France?", "advanced:50"), "Paris")
+        self.assertIsNone(reloaded.get("what's the capital of france", "advanced:10"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
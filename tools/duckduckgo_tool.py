@@ -1,8 +1,60 @@
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, Tuple
 from langchain_core.tools import BaseTool, StructuredTool
 from langchain_community.tools import DuckDuckGoSearchRun
+from duckduckgo_search.exceptions import DuckDuckGoSearchException
 from .base_tool import AgentTool
 
+# DuckDuckGo blocks clients that send several requests in quick succession,
+# so searches from all agents and threads share a small concurrency limit
+MAX_CONCURRENT_SEARCHES = 2
+_search_slots = threading.BoundedSemaphore(MAX_CONCURRENT_SEARCHES)
+
+# Seconds for which the result of an identical search is reused, and how many results are kept
+RESULT_TTL = 300
+MAX_CACHED_RESULTS = 256
+
+# Retries after a failed or rate-limited search, waiting RETRY_DELAY * 2**attempt seconds
+MAX_RETRIES = 2
+RETRY_DELAY = 1.0
+
+
+class ThrottledSearch:
+    """Runs DuckDuckGo searches with bounded concurrency, result reuse and backoff on errors"""
+    
+    def __init__(self, search_tool: DuckDuckGoSearchRun, ttl: float = RESULT_TTL):
+        self.search_tool = search_tool
+        self.ttl = ttl
+        self._results: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+    
+    def __call__(self, query: str) -> str:
+        with self._lock:
+            hit = self._results.get(query)
+        if hit is not None and time.time() - hit[0] < self.ttl:
+            return hit[1]
+        
+        result = self._search(query)
+        with self._lock:
+            self._results.pop(query, None)
+            self._results[query] = (time.time(), result)
+            if len(self._results) > MAX_CACHED_RESULTS:
+                # Dicts keep insertion order, so the first entry is the oldest
+                del self._results[next(iter(self._results))]
+        return result
+    
+    def _search(self, query: str) -> str:
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with _search_slots:
+                    return self.search_tool.run(query)
+            except DuckDuckGoSearchException:
+                if attempt == MAX_RETRIES:
+                    raise
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+
+
 class DuckDuckGoTool(AgentTool):
     """Tool for searching information on the internet using DuckDuckGo"""
     
@@ -27,7 +79,7 @@ class DuckDuckGoTool(AgentTool):
                                                             "Search query")
         
         return StructuredTool.from_function(
-            func=lambda query: search_tool.run(query),
+            func=ThrottledSearch(search_tool),
             name=name,
             description=description,
             args_schema={